@@ -0,0 +1,220 @@
+import time
+import argparse
+import numpy as np
+from steering import (
+    CENTER_POINT,
+    FLEEING,
+    RETURNING,
+    INITIAL_MODIFIERS,
+    REFERENCE_RATE,
+    Modifiers,
+    SeekerArrays,
+)
+from world import DEFAULT_SEEKERS
+
+# Observation columns per seeker
+OBSERVATION_FIELDS = ("x_pos", "y_pos", "x_velocity", "y_velocity", "fleeing")
+
+class BatchedWorld:
+    """K independent worlds of N seekers each, stepped together in the
+    style of a vectorized gym environment. Row w * N + i of the shared
+    SeekerArrays is seeker i of world w; targets, modes and modifier
+    values are per world
+    """
+
+    def __init__(
+        self,
+        worlds,
+        templates=DEFAULT_SEEKERS,
+        physics_rate=REFERENCE_RATE,
+        max_steps=None,
+        reward_fn=None,
+        spawn_bounds=None,
+        seed=None,
+    ):
+        """Initialize batch attributes.
+        templates are seeker dicts like DEFAULT_SEEKERS, repeated in
+        every world; spawn_bounds=(width, height) scatters them randomly
+        on reset instead of using their positions. Worlds are reset
+        automatically after max_steps steps. reward_fn(batch, obs)
+        returns one reward per world; without it rewards are zero
+        """
+
+        self.worlds = worlds
+        self.templates = templates
+        self.per_world = len(templates)
+        self.dt = REFERENCE_RATE / physics_rate
+        self.max_steps = max_steps
+        self.reward_fn = reward_fn
+        self.spawn_bounds = spawn_bounds
+        self.rng = np.random.default_rng(seed)
+
+        def column(field):
+            return np.tile(
+                [template[field] for template in templates],
+                worlds,
+            )
+
+        self.seeker_arrays = SeekerArrays(
+            x_pos=column("x_pos"),
+            y_pos=column("y_pos"),
+            max_speed=column("max_speed"),
+            mass=column("mass"),
+            radius=column("radius"),
+        )
+        self.home = self.seeker_arrays.pos.copy()
+        self.targets = np.tile(
+            np.asarray(CENTER_POINT, dtype=np.float64),
+            (worlds, 1),
+        )
+        self.fleeing = np.zeros(worlds, dtype=bool)
+        self.world_modifiers = {
+            name: np.full(worlds, float(value))
+            for name, value in INITIAL_MODIFIERS.items()
+        }
+        self.modifiers = Modifiers({
+            name: np.repeat(values, self.per_world)
+            for name, values in self.world_modifiers.items()
+        })
+        self.steps = np.zeros(worlds, dtype=np.int64)
+
+    def reset(self, worlds=None, seed=None):
+        """Put seekers of the given worlds (default all) back at their
+        start, at rest and RETURNING, reseeding spawns if seed is given.
+        Returns (observations, infos) for every world, like gym
+        """
+
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_worlds(worlds)
+        return self.observations(), {}
+
+    def _reset_worlds(self, worlds=None):
+        """Reset the given worlds (default all) without observing them"""
+
+        if worlds is None:
+            worlds = np.arange(self.worlds)
+        worlds = np.asarray(worlds, dtype=np.intp).reshape(-1)
+        rows = (
+            worlds[:, None] * self.per_world + np.arange(self.per_world)
+        ).reshape(-1)
+        arrays = self.seeker_arrays
+        if self.spawn_bounds is None:
+            arrays.pos[rows] = self.home[rows]
+        else:
+            arrays.pos[rows] = self.rng.uniform(
+                (0, 0),
+                self.spawn_bounds,
+                (len(rows), 2),
+            )
+        arrays.velocity[rows] = 0.0
+        arrays.state[rows] = RETURNING
+        self.steps[worlds] = 0
+
+    def set_modifier(self, name, values):
+        """Set modifier name in every world: one value, or one per world"""
+
+        world_values = self.world_modifiers[name]
+        world_values[:] = values
+        self.modifiers[name] = np.repeat(world_values, self.per_world)
+
+    def observations(self):
+        """(K, N, len(OBSERVATION_FIELDS)) array describing every seeker"""
+
+        arrays = self.seeker_arrays
+        observations = np.empty(
+            (self.worlds, self.per_world, len(OBSERVATION_FIELDS)),
+        )
+        flat = observations.reshape(-1, len(OBSERVATION_FIELDS))
+        flat[:, 0:2] = arrays.pos
+        flat[:, 2:4] = arrays.velocity
+        flat[:, 4] = arrays.state == FLEEING
+        return observations
+
+    def _apply_actions(self, actions):
+        """Read targets, modes and modifier values from actions"""
+
+        if isinstance(actions, dict):
+            if "target" in actions:
+                self.targets[:] = actions["target"]
+            if "flee" in actions:
+                self.fleeing[:] = actions["flee"]
+            for name in self.world_modifiers:
+                if name in actions:
+                    self.set_modifier(name, actions[name])
+            return
+        actions = np.asarray(actions, dtype=np.float64)
+        self.targets[:] = actions[:, :2]
+        if actions.shape[1] > 2:
+            self.fleeing[:] = actions[:, 2] > 0.5
+
+    def step(self, actions=None):
+        """Advance every world one step.
+        actions is (K, 2) targets, (K, 3) targets plus a flee flag, or a
+        dict with any of "target", "flee" and modifier names, each with
+        one row per world; None keeps the previous inputs.
+        Returns (observations, rewards, terminated, truncated, infos);
+        finished worlds are reset. infos["final_observation"] then holds
+        one entry per world, the last observation of a finished world
+        and None for the rest, and infos["_final_observation"] marks
+        which worlds finished
+        """
+
+        if actions is not None:
+            self._apply_actions(actions)
+        self.seeker_arrays.update(
+            np.repeat(self.fleeing, self.per_world),
+            np.repeat(self.targets, self.per_world, axis=0),
+            self.modifiers,
+            self.dt,
+        )
+        self.steps += 1
+        observations = self.observations()
+        if self.reward_fn is None:
+            rewards = np.zeros(self.worlds)
+        else:
+            rewards = np.asarray(self.reward_fn(self, observations))
+        terminated = np.zeros(self.worlds, dtype=bool)
+        if self.max_steps is None:
+            truncated = np.zeros(self.worlds, dtype=bool)
+        else:
+            truncated = self.steps >= self.max_steps
+        infos = {}
+        done = terminated | truncated
+        if done.any():
+            final = np.full(self.worlds, None, dtype=object)
+            for world in np.flatnonzero(done):
+                final[world] = observations[world]
+            infos["final_observation"] = final
+            infos["_final_observation"] = done
+            self._reset_worlds(np.flatnonzero(done))
+            observations = self.observations()
+        return observations, rewards, terminated, truncated, infos
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Time a batch of independent worlds",
+    )
+    parser.add_argument("--worlds", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    batch = BatchedWorld(
+        args.worlds,
+        spawn_bounds=(800, 800),
+        seed=args.seed,
+    )
+    batch.reset()
+    rng = np.random.default_rng(args.seed)
+    actions = np.column_stack((
+        rng.uniform(0, 800, (args.worlds, 2)),
+        rng.integers(0, 2, args.worlds),
+    ))
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        batch.step(actions)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{args.steps} steps x {args.worlds} worlds in {elapsed:.3f}s "
+        f"({args.steps * args.worlds / elapsed:,.0f} world-steps/s)"
+    )
@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from steering import Mode, CENTER_POINT, INITIAL_MODIFIERS, Modifiers
+from world import SteeringWorld, default_seekers
+from sweep import ORBIT_RADIUS, ORBIT_SPEED
+
+SIZES = (3, 100, 1000, 10000, 100000)
+ENGINES = ("scalar", "vectorized")
+RENDERERS = ("circles", "sprites", "points")
+# Seek target away from the spawn area so agents keep moving
+SEEK_TARGET = (600, 200)
+
+def time_frames(frame, frames, max_seconds, warmup=3):
+    """Call frame(i) repeatedly; return per-frame seconds.
+    Stops early once max_seconds is spent, keeping at least 10 frames
+    """
+
+    for index in range(warmup):
+        frame(index)
+    samples = []
+    budget_start = time.perf_counter()
+    for index in range(frames):
+        start = time.perf_counter()
+        frame(warmup + index)
+        samples.append(time.perf_counter() - start)
+        if (
+            len(samples) >= 10
+            and time.perf_counter() - budget_start > max_seconds
+        ):
+            break
+    return np.array(samples)
+
+def summarize(samples, population):
+    """Agent-updates per second and frame-time percentiles in ms"""
+
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99)) * 1000
+    return {
+        "population": population,
+        "frames": len(samples),
+        "agent_updates_per_s": population * len(samples) / samples.sum(),
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+    }
+
+def bench_steering(engine, mode, population, frames, max_seconds):
+    """Time SteeringWorld.step in SEEK, or in FLEE with an orbiting
+    threat that keeps agents crossing the flee and calm distances.
+    Sleep stays off so every agent is updated every step, keeping
+    agent-updates comparable with baselines saved before sleep
+    """
+
+    random.seed(0)
+    world = SteeringWorld(
+        default_seekers(population=population),
+        engine=engine,
+        mods=Modifiers(INITIAL_MODIFIERS),
+        sleep=False,
+    )
+    world.mode = mode
+
+    def frame(index):
+        if mode == Mode.SEEK:
+            world.set_target(SEEK_TARGET)
+        else:
+            angle = index * ORBIT_SPEED
+            world.set_target((
+                CENTER_POINT[0] + ORBIT_RADIUS * math.cos(angle),
+                CENTER_POINT[1] + ORBIT_RADIUS * math.sin(angle),
+            ))
+        world.step()
+
+    return summarize(
+        time_frames(frame, frames, max_seconds),
+        population,
+    )
+
+def bench_render(renderer, population, frames, max_seconds):
+    """Time SeekAndFlee._draw_seekers for one renderer"""
+
+    from seek_and_flee import SeekAndFlee
+
+    random.seed(0)
+    game = SeekAndFlee(
+        engine="vectorized",
+        population=population,
+        renderer=renderer,
+    )
+    positions = game.world.render_positions(
+        as_array=game.sprite_batch is not None,
+    )
+
+    def frame(index):
+        game.screen.fill(game.colors["night_sky"])
+        game._draw_seekers(positions)
+
+    return summarize(
+        time_frames(frame, frames, max_seconds),
+        population,
+    )
+
+def run_suite(sizes, engines, renderers, frames, max_seconds, max_scalar):
+    """Run every case; return {case name: summary}"""
+
+    results = {}
+    for population in sizes:
+        for engine in engines:
+            if engine == "scalar" and population > max_scalar:
+                continue
+            for mode in (Mode.SEEK, Mode.FLEE):
+                name = f"{mode.name.lower()}/{engine}/{population}"
+                results[name] = bench_steering(
+                    engine,
+                    mode,
+                    population,
+                    frames,
+                    max_seconds,
+                )
+                _report(name, results[name])
+        for renderer in renderers:
+            name = f"render/{renderer}/{population}"
+            results[name] = bench_render(
+                renderer,
+                population,
+                frames,
+                max_seconds,
+            )
+            _report(name, results[name])
+    return results
+
+def compare(results, baseline, threshold):
+    """Names of cases whose p50 frame time grew by more than threshold"""
+
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["p50_ms"] / baseline[name]["p50_ms"]
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+def _report(name, result):
+    """Print one result row"""
+
+    print(
+        f"{name:<28} {result['agent_updates_per_s']:>14,.0f} upd/s"
+        f"  p50 {result['p50_ms']:8.3f}ms"
+        f"  p95 {result['p95_ms']:8.3f}ms"
+        f"  p99 {result['p99_ms']:8.3f}ms"
+    )
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark steering and drawing throughput",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=ENGINES,
+        default=ENGINES,
+    )
+    parser.add_argument(
+        "--renderers",
+        nargs="*",
+        choices=RENDERERS,
+        default=RENDERERS,
+    )
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=5.0,
+        help="time budget per case",
+    )
+    parser.add_argument(
+        "--max-scalar",
+        type=int,
+        default=10000,
+        help="largest population to run on the scalar engine",
+    )
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed p50 slowdown against the baseline, as a fraction",
+    )
+    args = parser.parse_args()
+    results = run_suite(
+        args.sizes,
+        args.engines,
+        args.renderers,
+        args.frames,
+        args.max_seconds,
+        args.max_scalar,
+    )
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold)
+        for name, ratio in regressions:
+            print(f"REGRESSION {name}: p50 x{ratio:.2f}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
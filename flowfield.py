@@ -0,0 +1,269 @@
+import heapq
+from math import floor, sqrt
+import numpy as np
+
+# Default flow field resolution, in pixels per cell
+FLOW_CELL_SIZE = 8
+
+# Neighbor offsets and their step lengths in cells
+_NEIGHBORS = (
+    (1, 0, 1.0),
+    (-1, 0, 1.0),
+    (0, 1, 1.0),
+    (0, -1, 1.0),
+    (1, 1, sqrt(2)),
+    (1, -1, sqrt(2)),
+    (-1, 1, sqrt(2)),
+    (-1, -1, sqrt(2)),
+)
+
+def layout_key(
+    homes,
+    obstacles=(),
+    bounds=(800, 800),
+    cell_size=FLOW_CELL_SIZE,
+):
+    """Hashable description of a FlowField layout, for reuse checks"""
+
+    homes = np.asarray(homes, dtype=np.float64).reshape(-1, 2)
+    obstacles = np.asarray(obstacles, dtype=np.float64).reshape(-1, 3)
+    return (
+        tuple(map(tuple, homes.tolist())),
+        tuple(map(tuple, obstacles.tolist())),
+        tuple(bounds),
+        float(cell_size),
+    )
+
+def _segments_clear(starts, ends, obstacles):
+    """Which start-end segments miss every (x, y, radius) obstacle.
+    starts is (N, 2), ends is (N, H, 2); returns an (N, H) mask
+    """
+
+    clear = np.ones(ends.shape[:2], dtype=bool)
+    span = ends - starts[:, None]
+    span_sq = np.einsum("ijk,ijk->ij", span, span)
+    for x, y, radius in obstacles:
+        offset = (x, y) - starts[:, None]
+        along = np.clip(
+            np.einsum("ijk,ijk->ij", offset, span)
+            / np.where(span_sq > 0, span_sq, 1.0),
+            0.0,
+            1.0,
+        )
+        miss = offset - span * along[..., None]
+        clear &= np.einsum("ijk,ijk->ij", miss, miss) > radius * radius
+    return clear
+
+class FlowField:
+    """Precomputed way home from anywhere in bounds.
+    Each cell stores where a RETURNING seeker should head next and how
+    much path is left from there: its nearest home point if that is in
+    plain sight, otherwise the furthest visible waypoint on the shortest
+    route around the circular obstacles. Steering home is then one
+    lookup and one straight-line arrival, however many homes and
+    obstacles there are
+    """
+
+    def __init__(
+        self,
+        homes,
+        obstacles=(),
+        bounds=(800, 800),
+        cell_size=FLOW_CELL_SIZE,
+    ):
+        """Build the field.
+        homes is a sequence of (x, y) points; obstacles a sequence of
+        (x, y, radius) circles; bounds the (width, height) covered.
+        Positions outside bounds use the nearest edge cell
+        """
+
+        self.homes = np.asarray(homes, dtype=np.float64).reshape(-1, 2)
+        if not len(self.homes):
+            raise ValueError("a flow field needs at least one home point")
+        self.obstacles = np.asarray(
+            obstacles,
+            dtype=np.float64,
+        ).reshape(-1, 3)
+        self.bounds = tuple(bounds)
+        self.cell_size = float(cell_size)
+        self.shape = (
+            max(1, int(np.ceil(bounds[0] / self.cell_size))),
+            max(1, int(np.ceil(bounds[1] / self.cell_size))),
+        )
+        self.layout = layout_key(
+            self.homes,
+            self.obstacles,
+            self.bounds,
+            self.cell_size,
+        )
+        self._build()
+
+    def _build(self):
+        """Integrate path distances outward from the homes"""
+
+        width, height = self.shape
+        count = width * height
+        # Cell (ix, iy) is row ix * height + iy, like UniformGrid keys
+        ix, iy = np.divmod(np.arange(count), height)
+        centers = (np.column_stack((ix, iy)) + 0.5) * self.cell_size
+        offsets = self.homes[None] - centers[:, None]
+        home_distance = np.hypot(offsets[..., 0], offsets[..., 1])
+        nearest = np.argmin(home_distance, axis=1)
+        blocked = np.zeros(count, dtype=bool)
+        for x, y, radius in self.obstacles:
+            inside = np.hypot(centers[:, 0] - x, centers[:, 1] - y) <= radius
+            blocked |= inside
+
+        # Cells that see a home in a straight line start at that distance
+        visible = _segments_clear(
+            centers,
+            np.broadcast_to(self.homes, offsets.shape),
+            self.obstacles,
+        ) & ~blocked[:, None]
+        seen_distance = np.where(visible, home_distance, np.inf)
+        cost = seen_distance.min(axis=1)
+        home = np.argmin(seen_distance, axis=1)
+        for index, (x, y) in enumerate(self.homes.tolist()):
+            cell = (
+                min(max(floor(x / self.cell_size), 0), width - 1) * height
+                + min(max(floor(y / self.cell_size), 0), height - 1)
+            )
+            if home_distance[cell, index] < cost[cell]:
+                cost[cell] = home_distance[cell, index]
+                home[cell] = index
+
+        # Dijkstra over free cells routes everything else around obstacles
+        cost = cost.tolist()
+        home = home.tolist()
+        free = (~blocked).tolist()
+        parent = [-1] * count
+        queue = [(c, cell) for cell, c in enumerate(cost) if c < np.inf]
+        heapq.heapify(queue)
+        while queue:
+            c, cell = heapq.heappop(queue)
+            if c > cost[cell]:
+                continue
+            x, y = divmod(cell, height)
+            for dx, dy, step in _NEIGHBORS:
+                nx = x + dx
+                ny = y + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                neighbor = nx * height + ny
+                if not free[neighbor]:
+                    continue
+                # No cutting the corner of a blocked cell
+                if dx and dy and not (
+                    free[nx * height + y] and free[x * height + ny]
+                ):
+                    continue
+                new_cost = c + step * self.cell_size
+                if new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    home[neighbor] = home[cell]
+                    parent[neighbor] = cell
+                    heapq.heappush(queue, (new_cost, neighbor))
+
+        cost = np.array(cost)
+        home = np.array(home)
+        reachable = np.isfinite(cost)
+        goal = self.homes[np.where(reachable, home, nearest)]
+        # Each routed cell heads for a waypoint cell; shortcut the route
+        # to its waypoint's waypoint while that stays in plain sight
+        via = np.array(parent)
+        while True:
+            hopping = np.flatnonzero(via >= 0)
+            skip = via[via[hopping]]
+            ahead = np.where(
+                (skip >= 0)[:, None],
+                centers[skip],
+                goal[hopping],
+            )
+            clear = _segments_clear(
+                centers[hopping],
+                ahead[:, None],
+                self.obstacles,
+            )[:, 0]
+            if not clear.any():
+                break
+            via[hopping[clear]] = skip[clear]
+        routed = via >= 0
+        self.waypoint = np.where(routed[:, None], centers[via], goal)
+        # Path length still to go once a seeker reaches its waypoint
+        self.remaining = np.where(routed, cost[via], 0.0)
+        # Per-cell tuples for the scalar engine's one-seeker lookups
+        self._inverse_cell = 1 / self.cell_size
+        self._last_cell = (width - 1, height - 1)
+        self._cells = [
+            (x, y, remaining)
+            for (x, y), remaining in zip(
+                self.waypoint.tolist(),
+                self.remaining.tolist(),
+            )
+        ]
+
+    def _cell_indices(self, pos):
+        """Flat cell index for each row of pos, clamped into bounds"""
+
+        cells = np.floor(pos * self._inverse_cell)
+        np.clip(cells, 0, self._last_cell, out=cells)
+        return (cells[:, 0] * self.shape[1] + cells[:, 1]).astype(np.intp)
+
+    def desired_velocities(self, pos, max_speed, slowing_distance):
+        """Batched desired velocity home, with the arrival ramp.
+        The ramp uses the whole path length, not just the straight
+        line to the waypoint, so seekers only slow down near home
+        """
+
+        cells = self._cell_indices(pos)
+        # Gathered in pos's dtype, so float32 storage stays float32
+        displacement = np.take(self.waypoint, cells, axis=0).astype(
+            pos.dtype,
+            copy=False,
+        ) - pos
+        distance = np.hypot(displacement[:, 0], displacement[:, 1])
+        moving = distance >= 1
+        safe_distance = np.where(moving, distance, 1.0)
+        remaining = np.take(self.remaining, cells).astype(
+            pos.dtype,
+            copy=False,
+        )
+        clipped_speed = np.minimum(
+            max_speed * ((distance + remaining) / slowing_distance),
+            max_speed,
+        )
+        scale = np.where(moving, clipped_speed / safe_distance, 0.0)
+        return displacement * scale[:, None]
+
+    def desired_velocity(self, x, y, max_speed, slowing_distance):
+        """desired_velocities for one seeker, as an (x, y) pair"""
+
+        # Truncation only differs from floor below zero, which clamps
+        # to the first cell either way
+        cell_x = int(x * self._inverse_cell)
+        cell_y = int(y * self._inverse_cell)
+        last_x, last_y = self._last_cell
+        if cell_x < 0:
+            cell_x = 0
+        elif cell_x > last_x:
+            cell_x = last_x
+        if cell_y < 0:
+            cell_y = 0
+        elif cell_y > last_y:
+            cell_y = last_y
+        waypoint_x, waypoint_y, remaining = (
+            self._cells[cell_x * (last_y + 1) + cell_y]
+        )
+        x_diff = waypoint_x - x
+        y_diff = waypoint_y - y
+        distance = sqrt(x_diff * x_diff + y_diff * y_diff)
+        if distance < 1:
+            return 0.0, 0.0
+        clipped_speed = min(
+            max_speed * ((distance + remaining) / slowing_distance),
+            max_speed,
+        )
+        return (
+            (x_diff / distance) * clipped_speed,
+            (y_diff / distance) * clipped_speed,
+        )
@@ -0,0 +1,79 @@
+from collections import deque
+
+# Quality levels, best first; each one also keeps every cut before it
+QUALITY_LEVELS = (
+    "full",
+    "lazy_ui",
+    "cheap_draw",
+    "offscreen_stride",
+    "few_substeps",
+)
+
+class FrameGovernor:
+    """Hold frame work time to a budget by trading quality in steps.
+    Feed it each frame's busy time, excluding the wait for the next
+    frame. When the mean over a window runs over budget it drops one
+    level, and when it falls under restore_at of the budget it climbs
+    back one. Every change starts a fresh window, so each level gets a
+    fair measurement before the next decision
+    """
+
+    def __init__(
+        self,
+        budget_seconds=1 / 60,
+        window=30,
+        restore_at=0.6,
+        max_level=len(QUALITY_LEVELS) - 1,
+    ):
+        """Initialize governor attributes"""
+
+        self.budget_seconds = budget_seconds
+        self.window = window
+        self.restore_at = restore_at
+        self.max_level = max_level
+        self.samples = deque(maxlen=window)
+        self.level = 0
+        self.changes = 0
+
+    @property
+    def name(self):
+        """Name of the current quality level"""
+
+        return QUALITY_LEVELS[self.level]
+
+    def record(self, busy_seconds):
+        """Add one frame's work time; return the new level if it
+        changed, else None
+        """
+
+        self.samples.append(busy_seconds)
+        if len(self.samples) < self.window:
+            return None
+        mean = sum(self.samples) / len(self.samples)
+        level = self.level
+        if mean > self.budget_seconds and level < self.max_level:
+            level += 1
+        elif mean < self.budget_seconds * self.restore_at and level > 0:
+            level -= 1
+        else:
+            return None
+        self.level = level
+        self.changes += 1
+        self.samples.clear()
+        return level
+
+    def stats(self):
+        """Current level, its name, level changes so far and the mean
+        busy ms of the window being measured
+        """
+
+        mean = (
+            sum(self.samples) / len(self.samples) * 1000
+            if self.samples else None
+        )
+        return {
+            "level": self.level,
+            "name": self.name,
+            "changes": self.changes,
+            "mean_ms": mean,
+        }
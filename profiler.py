@@ -0,0 +1,226 @@
+import csv
+import json
+import time
+from collections import deque
+import numpy as np
+
+class _Section:
+    """Context manager that adds its elapsed time to one phase"""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        """Initialize section attributes"""
+
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + elapsed
+        return False
+
+class _NullSection:
+    """Context manager that does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SECTION = _NullSection()
+
+class NullProfiler:
+    """Stand-in with FrameProfiler's API that records nothing"""
+
+    enabled = False
+
+    def section(self, name):
+        """Return a context manager that times nothing"""
+
+        return _NULL_SECTION
+
+    def timed(self, name):
+        """Decorator that leaves the function untouched"""
+
+        return lambda function: function
+
+    def begin_frame(self):
+        """Do nothing"""
+
+    def end_frame(self):
+        """Do nothing"""
+
+    def close(self):
+        """Do nothing"""
+
+class StartupTimer:
+    """Time the phases of startup once, for a one-off report.
+    Call mark(name) as each phase ends; it runs from the previous mark
+    """
+
+    def __init__(self):
+        """Start the clock"""
+
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = {}
+
+    def mark(self, name):
+        """End phase name at the current time"""
+
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self.last
+        self.last = now
+
+    def report(self, title="startup"):
+        """Lines of ms per phase, under the total since the timer began"""
+
+        lines = [f"{title} {(self.last - self.start) * 1000:.1f}ms"]
+        lines.extend(
+            f"  {name} {seconds * 1000:.1f}ms"
+            for name, seconds in self.phases.items()
+        )
+        return "\n".join(lines)
+
+class FrameSink:
+    """Stream per-frame phase timings to a JSON-lines or CSV file.
+    The format follows the extension. CSV is long-format, one
+    frame,phase,ms row per phase, so a phase that first appears late
+    just adds rows
+    """
+
+    def __init__(self, path):
+        """Open the output file"""
+
+        self.path = path
+        self.file = open(path, "w", newline="")
+        self.csv = path.endswith(".csv")
+        self.writer = None
+        if self.csv:
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(("frame", "phase", "ms"))
+
+    def write(self, frame, phases):
+        """Append one frame of timings, in milliseconds"""
+
+        if self.csv:
+            self.writer.writerows(
+                (frame, name, seconds * 1000)
+                for name, seconds in phases.items()
+            )
+            return
+        row = {"frame": frame}
+        row.update(
+            (name, seconds * 1000) for name, seconds in phases.items()
+        )
+        self.file.write(json.dumps(row) + "\n")
+
+    def close(self):
+        """Flush and close the file"""
+
+        self.file.close()
+
+class FrameProfiler:
+    """Time named phases of every frame with rolling statistics.
+    Wrap phases in section(name); custom steering code can time its own
+    sections the same way through active_profiler()
+    """
+
+    enabled = True
+
+    def __init__(self, history=240, sink=None):
+        """Initialize profiler attributes"""
+
+        self.history_length = history
+        self.history = {}
+        self.totals = deque(maxlen=history)
+        self.current = {}
+        self.sink = sink
+        self.frame = 0
+        self.frame_start = None
+
+    def section(self, name):
+        """Context manager adding its elapsed time to phase name"""
+
+        return _Section(self, name)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as phase name"""
+
+        def decorate(function):
+            def wrapper(*args, **kwargs):
+                with self.section(name):
+                    return function(*args, **kwargs)
+            wrapper.__name__ = function.__name__
+            wrapper.__doc__ = function.__doc__
+            return wrapper
+        return decorate
+
+    def begin_frame(self):
+        """Start timing a new frame"""
+
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Fold the frame's phases into history and the sink"""
+
+        total = time.perf_counter() - self.frame_start
+        self.totals.append(total)
+        for name in self.current:
+            if name not in self.history:
+                self.history[name] = deque(
+                    [0.0] * (len(self.totals) - 1),
+                    maxlen=self.history_length,
+                )
+        for name, samples in self.history.items():
+            samples.append(self.current.get(name, 0.0))
+        if self.sink is not None:
+            self.sink.write(self.frame, dict(self.current, total=total))
+        self.frame += 1
+
+    def stats(self):
+        """Mean, p50, p95 and max in ms per phase over the history"""
+
+        phases = dict(self.history, total=self.totals)
+        stats = {}
+        for name, samples in phases.items():
+            if not samples:
+                continue
+            values = np.fromiter(samples, dtype=np.float64) * 1000
+            p50, p95 = np.percentile(values, (50, 95))
+            stats[name] = {
+                "mean": float(values.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "max": float(values.max()),
+            }
+        return stats
+
+    def close(self):
+        """Close the sink, if any"""
+
+        if self.sink is not None:
+            self.sink.close()
+
+_active = NullProfiler()
+
+def active_profiler():
+    """The profiler custom code should time its sections with"""
+
+    return _active
+
+def set_active_profiler(profiler):
+    """Make profiler the one active_profiler() returns"""
+
+    global _active
+    _active = profiler if profiler is not None else NullProfiler()
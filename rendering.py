@@ -0,0 +1,312 @@
+import numpy as np
+import pygame
+
+_fonts = {}
+
+def cached_font(name, size, bold=False):
+    """pygame.font.SysFont, looked up once per process for each name,
+    size and bold; initializes the font module on first use
+    """
+
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[key] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
+class DirtyRectTracker:
+    """Track what changed between frames and which screen rects need
+    repainting. collect() returns None when a full redraw is cheaper
+    """
+
+    def __init__(self, screen_rect, max_rects=200, max_fraction=0.5):
+        """Initialize tracker attributes"""
+
+        self.screen_rect = screen_rect
+        self.max_rects = max_rects
+        self.max_area = screen_rect.width * screen_rect.height * max_fraction
+        self.previous_seekers = None
+        self.previous_items = {}
+        self.pending_items = []
+        self.force_full = True
+
+    def reset(self):
+        """Repaint everything next frame, e.g. after the window is exposed"""
+
+        self.force_full = True
+
+    @staticmethod
+    def seeker_rects(positions, radii):
+        """(N, 4) x, y, w, h bounding rects for circles, padded a pixel"""
+
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        radii = np.asarray(radii, dtype=np.float64)
+        rects = np.empty((len(positions), 4), dtype=np.int64)
+        rects[:, 0] = np.floor(positions[:, 0] - radii) - 1
+        rects[:, 1] = np.floor(positions[:, 1] - radii) - 1
+        rects[:, 2] = np.ceil(radii * 2) + 3
+        rects[:, 3] = rects[:, 2]
+        return rects
+
+    @staticmethod
+    def overlapping(rects, rect):
+        """Indices of rows of an (N, 4) rect array that overlap rect"""
+
+        return np.nonzero(
+            (rects[:, 0] < rect.right)
+            & (rects[:, 0] + rects[:, 2] > rect.left)
+            & (rects[:, 1] < rect.bottom)
+            & (rects[:, 1] + rects[:, 3] > rect.top)
+        )[0]
+
+    def mark_item(self, key, rect, state):
+        """Note a UI item's rect and look; it is dirty if either changed"""
+
+        previous = self.previous_items.get(key)
+        if previous is None or previous != (rect, state):
+            if previous is not None:
+                self.pending_items.append(previous[0])
+            self.pending_items.append(rect)
+        self.previous_items[key] = (pygame.Rect(rect), state)
+
+    def collect(self, seeker_rects):
+        """Rects to repaint this frame, or None for a full redraw"""
+
+        previous = self.previous_seekers
+        self.previous_seekers = seeker_rects
+        items = self.pending_items
+        self.pending_items = []
+        if (
+            self.force_full
+            or previous is None
+            or previous.shape != seeker_rects.shape
+        ):
+            self.force_full = False
+            return None
+        moved = np.any(previous != seeker_rects, axis=1)
+        changed = np.concatenate((previous[moved], seeker_rects[moved]))
+        if len(changed) + len(items) > self.max_rects:
+            return None
+        dirty = [pygame.Rect(rect) for rect in changed.tolist()] + items
+        dirty = [
+            rect.clip(self.screen_rect)
+            for rect in dirty
+            if rect.colliderect(self.screen_rect)
+        ]
+        if sum(rect.width * rect.height for rect in dirty) > self.max_area:
+            return None
+        return dirty
+
+class SpriteBatch:
+    """Draw a seeker population from pre-rasterized circle sprites.
+    One sprite per (color, radius); every frame is one Surface.blits
+    call, or single pixels when there are more than point_threshold
+    """
+
+    def __init__(self, colors, radii, mode="sprites", point_threshold=50000):
+        """Initialize batch attributes; colors and radii are per seeker"""
+
+        self.mode = mode
+        self.point_threshold = point_threshold
+        self.radii = np.asarray(radii, dtype=np.float64)
+        self.colors = [pygame.Color(color) for color in colors]
+        self.sprites = {}
+        self.seeker_sprites = [
+            self._sprite(color, radius)
+            for color, radius in zip(self.colors, self.radii.tolist())
+        ]
+        self.mapped_colors = None
+
+    def _sprite(self, color, radius):
+        """Rasterize, or reuse, the circle sprite for color and radius"""
+
+        key = (tuple(color), radius)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            size = int(np.ceil(radius * 2)) + 2
+            sprite = pygame.Surface((size, size))
+            colorkey = (0, 0, 0)
+            if tuple(color)[:3] == colorkey:
+                colorkey = (1, 1, 1)
+            sprite.fill(colorkey)
+            pygame.draw.circle(sprite, color, (size / 2, size / 2), radius)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+            self.sprites[key] = sprite
+        return sprite
+
+    def draw(self, screen, positions, indices=None):
+        """Draw seekers at positions, optionally only the given indices"""
+
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        if indices is None:
+            indices = np.arange(len(positions))
+            sprites = self.seeker_sprites
+        else:
+            indices = np.asarray(indices, dtype=np.intp)
+            sprites = [self.seeker_sprites[index] for index in indices.tolist()]
+        if self.mode == "points" or len(indices) > self.point_threshold:
+            self._draw_points(screen, positions, indices)
+            return
+        # Sprites are centered in a square of ceil(2r) + 2 pixels
+        half = np.ceil(self.radii[indices] * 2) / 2 + 1
+        topleft = np.floor(positions[indices] - half[:, None]).astype(int)
+        screen.blits(zip(sprites, topleft.tolist()), doreturn=False)
+
+    def _draw_points(self, screen, positions, indices):
+        """Write one pixel per seeker straight into the surface"""
+
+        if self.mapped_colors is None:
+            self.mapped_colors = np.array(
+                [screen.map_rgb(color) for color in self.colors],
+                dtype=np.uint32,
+            )
+        clip = screen.get_clip()
+        xy = np.floor(positions[indices]).astype(np.intp)
+        inside = (
+            (xy[:, 0] >= clip.left) & (xy[:, 0] < clip.right)
+            & (xy[:, 1] >= clip.top) & (xy[:, 1] < clip.bottom)
+        )
+        pixels = pygame.surfarray.pixels2d(screen)
+        pixels[xy[inside, 0], xy[inside, 1]] = (
+            self.mapped_colors[indices[inside]]
+        )
+        del pixels
+
+class SleeperLayer:
+    """Sleeping seekers pre-drawn onto one colorkeyed copy of the
+    background, so a frame blits them once instead of drawing each.
+    Sleepers only accumulate until the world wakes everyone, so new
+    ones are drawn on top and a wake clears the layer
+    """
+
+    def __init__(self, screen, background, min_sleepers=16):
+        """Initialize layer attributes"""
+
+        self.surface = screen.copy()
+        self.background = background
+        self.min_sleepers = min_sleepers
+        self.surface.fill(background)
+        self.surface.set_colorkey(background, pygame.RLEACCEL)
+        self.drawn = None
+
+    def active(self, asleep):
+        """Whether enough seekers sleep for the layer to pay off"""
+
+        return np.count_nonzero(asleep) >= self.min_sleepers
+
+    def refresh(self, asleep, draw):
+        """Bring the layer in line with the asleep mask.
+        draw(surface, indices) paints those seekers onto surface
+        """
+
+        if (
+            self.drawn is None
+            or self.drawn.shape != asleep.shape
+            or (self.drawn & ~asleep).any()
+        ):
+            self.surface.fill(self.background)
+            self.drawn = np.zeros_like(asleep)
+        new = np.flatnonzero(asleep & ~self.drawn)
+        if len(new):
+            draw(self.surface, new)
+            self.drawn[new] = True
+
+    def invalidate(self):
+        """Redraw every sleeper at the next refresh, as after a wake"""
+
+        self.drawn = None
+
+    @staticmethod
+    def awake(asleep):
+        """Indices of seekers still drawn one by one"""
+
+        return np.flatnonzero(~asleep)
+
+    def draw(self, screen):
+        """Blit every sleeping seeker at once"""
+
+        screen.blit(self.surface, (0, 0))
+
+class ProfilerOverlay:
+    """Stacked per-phase frame-time graph drawn over the scene.
+    One pixel column per frame; the line marks the frame budget
+    """
+
+    def __init__(self, profiler, font, rect, colors, budget_ms=1000 / 60):
+        """Initialize overlay attributes"""
+
+        self.profiler = profiler
+        self.font = font
+        self.rect = pygame.Rect(rect)
+        self.colors = colors
+        self.budget_ms = budget_ms
+        self.scale = self.rect.height / (budget_ms * 2)
+        self.backdrop = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self.backdrop.fill((0, 0, 0, 160))
+        self.legend = []
+        self.legend_frame = None
+
+    def draw(self, screen):
+        """Draw the graph and a legend of mean ms per phase"""
+
+        screen.blit(self.backdrop, self.rect.topleft)
+        phases = [
+            name for name in self.profiler.history if name != "idle"
+        ]
+        columns = [
+            list(self.profiler.history[name])[-self.rect.width:]
+            for name in phases
+        ]
+        if columns and columns[0]:
+            left = self.rect.right - len(columns[0])
+            heights = np.cumsum(
+                np.array(columns, dtype=np.float64) * 1000 * self.scale,
+                axis=0,
+            )
+            heights = np.minimum(heights, self.rect.height)
+            bottom = self.rect.bottom - 1
+            for row, name in enumerate(phases):
+                color = self.colors[row % len(self.colors)]
+                low = heights[row - 1] if row else np.zeros(heights.shape[1])
+                for x, (start, stop) in enumerate(
+                    zip(low.tolist(), heights[row].tolist())
+                ):
+                    if stop - start >= 1:
+                        pygame.draw.line(
+                            screen,
+                            color,
+                            (left + x, bottom - start),
+                            (left + x, bottom - stop),
+                        )
+        budget_y = self.rect.bottom - 1 - self.budget_ms * self.scale
+        pygame.draw.line(
+            screen,
+            (255, 255, 255),
+            (self.rect.left, budget_y),
+            (self.rect.right - 1, budget_y),
+        )
+        # Re-render legend text a few times a second, not every frame
+        if (
+            self.legend_frame is None
+            or self.profiler.frame - self.legend_frame >= 15
+        ):
+            stats = self.profiler.stats()
+            self.legend = [
+                self.font.render(
+                    f"{name} {stats[name]['mean']:.2f}ms",
+                    True,
+                    self.colors[row % len(self.colors)]
+                    if name != "total" else (255, 255, 255),
+                )
+                for row, name in enumerate(phases + ["total"])
+                if name in stats
+            ]
+            self.legend_frame = self.profiler.frame
+        y = self.rect.top + 2
+        for text in self.legend:
+            screen.blit(text, (self.rect.left + 2, y))
+            y += text.get_height()
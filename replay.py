@@ -0,0 +1,312 @@
+import json
+import time
+import struct
+import argparse
+import numpy as np
+from steering import Mode, INITIAL_MODIFIERS, Modifiers, SeekerState
+from world import Seeker, SteeringWorld
+
+MAGIC = b"SFRL"
+FORMAT_VERSION = 1
+NO_THREATS = 0xFFFFFFFF
+MODIFIER_NAMES = tuple(INITIAL_MODIFIERS)
+SEEKER_FIELDS = (
+    "x_pos",
+    "y_pos",
+    "max_speed",
+    "mass",
+    "radius",
+)
+
+# Record layouts: a kind byte, then the payload
+_HEADER = struct.Struct("<4sHI")
+_STEP = struct.Struct("<cddBI")
+_MODIFIER = struct.Struct("<cBd")
+_THREATS = struct.Struct("<c?I")
+_HOMES = struct.Struct("<cIIddd")
+_END = struct.Struct("<c32s")
+
+def world_snapshot(world):
+    """Everything needed to rebuild world's current state, as JSON data"""
+
+    world.sync_seekers()
+    seekers = world.seekers
+    snapshot = {
+        "engine": world.engine,
+        "dtype": (
+            world.seeker_arrays.pos.dtype.name
+            if world.engine == "vectorized" else "float64"
+        ),
+        "dt": world.dt,
+        "separation": world.separation,
+        "frame": world.frame,
+        "modifiers": dict(world.modifiers),
+        "velocity": [tuple(seeker.velocity) for seeker in seekers],
+        "state": [seeker.state.value for seeker in seekers],
+        "threats": None if world.threats is None else world.threats.tolist(),
+        "weighted_threats": world.weighted_threats,
+        "homes": _home_layout(world.flow_field),
+    }
+    for field in SEEKER_FIELDS:
+        snapshot[field] = [getattr(seeker, field) for seeker in seekers]
+    return snapshot
+
+def _home_layout(flow_field):
+    """set_homes() arguments that rebuild flow_field, or None"""
+
+    if flow_field is None:
+        return None
+    return {
+        "homes": flow_field.homes.tolist(),
+        "obstacles": flow_field.obstacles.tolist(),
+        "bounds": list(flow_field.bounds),
+        "cell_size": flow_field.cell_size,
+    }
+
+def world_from_snapshot(snapshot, engine=None):
+    """Rebuild a headless SteeringWorld from world_snapshot data"""
+
+    seekers = []
+    for index in range(len(snapshot["x_pos"])):
+        seeker = Seeker(
+            color=None,
+            **{field: snapshot[field][index] for field in SEEKER_FIELDS},
+        )
+        seeker.velocity.update(snapshot["velocity"][index])
+        seeker.state = SeekerState(snapshot["state"][index])
+        seekers.append(seeker)
+    world = SteeringWorld(
+        seekers,
+        engine=engine or snapshot["engine"],
+        mods=Modifiers(snapshot["modifiers"]),
+        separation=snapshot["separation"],
+        dtype=np.dtype(snapshot.get("dtype", "float64")),
+    )
+    world.dt = snapshot["dt"]
+    world.frame = snapshot["frame"]
+    if snapshot.get("threats") is not None:
+        world.set_threats(snapshot["threats"], snapshot["weighted_threats"])
+    if snapshot.get("homes") is not None:
+        world.set_homes(**snapshot["homes"])
+    return world
+
+class InputRecorder:
+    """Log everything that drives a SteeringWorld to a compact binary
+    file: a JSON snapshot header, then one record per step() call,
+    one per modifier change and one per set_threats() or set_homes()
+    call, then a digest of the final state
+    """
+
+    def __init__(self, path, world):
+        """Open path and write the starting snapshot of world"""
+
+        self.file = open(path, "wb")
+        header = json.dumps(world_snapshot(world)).encode()
+        self.file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+        self.file.write(header)
+        self.modifiers = dict(world.modifiers)
+        self.version = getattr(world.modifiers, "version", None)
+        self.threats = (world.threats, world.weighted_threats)
+        self.flow_field = world.flow_field
+
+    def record(self, world, steps):
+        """Log the inputs world is about to run steps with"""
+
+        mods = world.modifiers
+        version = getattr(mods, "version", None)
+        if version is None or version != self.version:
+            for index, name in enumerate(MODIFIER_NAMES):
+                if mods[name] != self.modifiers.get(name):
+                    self.file.write(
+                        _MODIFIER.pack(b"M", index, mods[name])
+                    )
+            self.modifiers = dict(mods)
+            self.version = version
+        threats = (world.threats, world.weighted_threats)
+        if (
+            threats[0] is not self.threats[0]
+            or threats[1] != self.threats[1]
+        ):
+            self._record_threats(*threats)
+            self.threats = threats
+        if world.flow_field is not self.flow_field:
+            self._record_homes(world.flow_field)
+            self.flow_field = world.flow_field
+        self.file.write(
+            _STEP.pack(
+                b"S",
+                world.target[0],
+                world.target[1],
+                world.mode.value,
+                steps,
+            )
+        )
+
+    def _record_threats(self, threats, weighted):
+        """Log a set_threats() call; a count of 0xFFFFFFFF means None"""
+
+        if threats is None:
+            self.file.write(_THREATS.pack(b"T", weighted, NO_THREATS))
+            return
+        self.file.write(_THREATS.pack(b"T", weighted, len(threats)))
+        self.file.write(np.ascontiguousarray(threats, dtype="<f8").tobytes())
+
+    def _record_homes(self, flow_field):
+        """Log a set_homes() call; zero homes means None"""
+
+        layout = _home_layout(flow_field)
+        if layout is None:
+            self.file.write(_HOMES.pack(b"H", 0, 0, 0.0, 0.0, 0.0))
+            return
+        self.file.write(
+            _HOMES.pack(
+                b"H",
+                len(layout["homes"]),
+                len(layout["obstacles"]),
+                *layout["bounds"],
+                layout["cell_size"],
+            )
+        )
+        self.file.write(flow_field.homes.astype("<f8").tobytes())
+        self.file.write(flow_field.obstacles.astype("<f8").tobytes())
+
+    def close(self, world):
+        """Write the final state digest and close the file"""
+
+        self.file.write(_END.pack(b"E", world.state_digest()))
+        self.file.close()
+
+def read_log(path):
+    """Return (snapshot, records, digest) from a recorded log.
+    Records are ("S", target, mode, steps), ("M", name, value),
+    ("T", threats or None, weighted) or ("H", set_homes() keyword
+    arguments or None)
+    """
+
+    with open(path, "rb") as log:
+        data = log.read()
+    magic, version, header_length = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} log")
+    offset = _HEADER.size
+    snapshot = json.loads(data[offset:offset + header_length])
+    offset += header_length
+    records = []
+    digest = None
+    while offset < len(data):
+        kind = data[offset:offset + 1]
+        if kind == b"S":
+            _, x, y, mode, steps = _STEP.unpack_from(data, offset)
+            records.append(("S", (x, y), Mode(mode), steps))
+            offset += _STEP.size
+        elif kind == b"M":
+            _, index, value = _MODIFIER.unpack_from(data, offset)
+            records.append(("M", MODIFIER_NAMES[index], value))
+            offset += _MODIFIER.size
+        elif kind == b"T":
+            _, weighted, count = _THREATS.unpack_from(data, offset)
+            offset += _THREATS.size
+            threats = None
+            if count != NO_THREATS:
+                threats = np.frombuffer(
+                    data,
+                    dtype="<f8",
+                    count=count * 2,
+                    offset=offset,
+                ).reshape(-1, 2)
+                offset += threats.nbytes
+            records.append(("T", threats, weighted))
+        elif kind == b"H":
+            _, homes, obstacles, width, height, cell_size = (
+                _HOMES.unpack_from(data, offset)
+            )
+            offset += _HOMES.size
+            layout = None
+            if homes:
+                points = np.frombuffer(
+                    data,
+                    dtype="<f8",
+                    count=homes * 2 + obstacles * 3,
+                    offset=offset,
+                )
+                offset += points.nbytes
+                layout = {
+                    "homes": points[:homes * 2].reshape(-1, 2),
+                    "obstacles": points[homes * 2:].reshape(-1, 3),
+                    "bounds": (width, height),
+                    "cell_size": cell_size,
+                }
+            records.append(("H", layout))
+        elif kind == b"E":
+            digest = _END.unpack_from(data, offset)[1]
+            offset += _END.size
+        else:
+            raise ValueError(f"bad record kind {kind!r} at byte {offset}")
+    return snapshot, records, digest
+
+def replay(path, engine=None):
+    """Feed a recorded log through a headless world as fast as possible.
+    Returns (world, digest recorded at the end of the run, or None)
+    """
+
+    snapshot, records, digest = read_log(path)
+    world = world_from_snapshot(snapshot, engine)
+    for record in records:
+        if record[0] == "S":
+            _, target, mode, steps = record
+            world.set_target(target)
+            world.mode = mode
+            world.step(steps)
+        elif record[0] == "M":
+            world.modifiers[record[1]] = record[2]
+        elif record[0] == "H":
+            if record[1] is None:
+                world.set_homes(None)
+            else:
+                world.set_homes(**record[1])
+        else:
+            world.set_threats(record[1], record[2])
+    return world, digest
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded seek and flee session headlessly",
+    )
+    parser.add_argument("log")
+    parser.add_argument(
+        "--engine",
+        choices=("scalar", "vectorized"),
+        default=None,
+        help="override the engine the session was recorded with",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="replay on both engines and report how far they drift",
+    )
+    args = parser.parse_args()
+    engines = ("scalar", "vectorized") if args.compare else (args.engine,)
+    start_frame = read_log(args.log)[0]["frame"]
+    positions = []
+    for engine in engines:
+        start = time.perf_counter()
+        world, digest = replay(args.log, engine)
+        elapsed = time.perf_counter() - start
+        world.sync_seekers()
+        positions.append(np.array(
+            [(seeker.x_pos, seeker.y_pos) for seeker in world.seekers]
+        ))
+        if digest is None:
+            verdict = "no recorded digest"
+        elif world.state_digest() == digest:
+            verdict = "bit-identical"
+        else:
+            verdict = "DIVERGED"
+        steps = world.frame - start_frame
+        print(
+            f"{world.engine}: {steps} steps in {elapsed:.3f}s "
+            f"({steps / elapsed:.0f} steps/s), {verdict}"
+        )
+    if args.compare:
+        drift = np.abs(positions[0] - positions[1]).max()
+        print(f"max position difference between engines: {drift:.3e}")
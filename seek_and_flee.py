@@ -1,47 +1,39 @@
 import sys
+import time
 import pygame
-from enum import Enum, auto
-
-class Mode(Enum):
-    SEEK = auto()
-    FLEE = auto()
-
-class SeekerState(Enum):
-    RETURNING = auto()
-    FLEEING = auto()
-
-INITIAL_MODIFIERS = {
-    "mass": 1.0,
-    "responsiveness": 1.0,
-    "max_speed": 1.0,
-    "max_force": 1.0,
-    "flee_distance": 150,
-    "calm_buffer": 1.1,
-}
-
-modifiers = INITIAL_MODIFIERS.copy()
-
-SLIDER_LUTS = {
-    "mass": (0.2, 0.4, 0.6, 0.8, 1.0, 1.2, 1.4, 1.6, 1.8, 2.0),
-    "responsiveness": (0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0),
-    "max_speed": (0.2, 0.4, 0.6, 0.8, 1.0, 1.2, 1.4, 1.6, 1.8, 2.0),
-    "max_force": (0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0),
-    "flee_distance": (50, 75, 100, 125, 150, 175, 200, 225, 250, 275),
-    "calm_buffer": (1, 1.1, 1.3, 1.6, 2.0, 2.5),
-}
-
-class Seeker:
-    """Class definition for seeker bots"""
-    def __init__(self, x_pos, y_pos, color, max_speed, mass, radius):
-        """Initialize seeker attributes"""
-        self.x_pos = x_pos
-        self.y_pos = y_pos
-        self.color = color
-        self.max_speed = max_speed
-        self.mass = mass
-        self.radius = radius
-        self.velocity = pygame.Vector2()
-        self.state = SeekerState.RETURNING
+import argparse
+from steering import (
+    Mode,
+    INITIAL_MODIFIERS,
+    SLIDER_LUTS,
+    REFERENCE_RATE,
+    Modifiers,
+    modifiers,
+)
+from world import (
+    LOD_BANDS,
+    SteeringWorld,
+    FixedTimestep,
+    default_seekers,
+)
+from governor import FrameGovernor
+from rendering import (
+    DirtyRectTracker,
+    SpriteBatch,
+    SleeperLayer,
+    ProfilerOverlay,
+    cached_font,
+)
+from profiler import (
+    FrameProfiler,
+    FrameSink,
+    NullProfiler,
+    StartupTimer,
+    set_active_profiler,
+)
+
+# What the governor's cheap_draw level swaps each renderer for
+CHEAPER_RENDERERS = {"circles": "sprites", "sprites": "points"}
 
 class Slider:
     """Class for an interactive slider"""
@@ -113,13 +105,14 @@ class Slider:
             (self.button_x, self.button_y), 
             self.button_radius,
         )
-        self.font = pygame.font.SysFont("Menlo", 14, bold=True)            
+        self.font = cached_font("Menlo", 14, bold=True)
         self.slider_label_text = self.font.render(
             self.name, 
             True, 
             self.colors["yellow_cream"],
         )
         self.slider_label_rect = self.slider_label_text.get_rect()
+        self.value_glyphs = {}
         self.label_height = self.slider_label_rect.height
         self.width_diff = (
             self.slider_rect.width 
@@ -129,6 +122,30 @@ class Slider:
             self.slider_rect.top 
             - (self.label_height * 1.5)
         )
+        value_width = max(
+            self.font.size(f"{value}")[0]
+            for value in SLIDER_LUTS[self.name]
+        )
+        outline = self.button_radius + 2
+        self.panel_rect = pygame.Rect(
+            self.slider_rect.left + (self.width_diff / 2),
+            self.label_slider_gap,
+            self.slider_label_rect.width,
+            self.label_height,
+        ).unionall([
+            pygame.Rect(
+                self.slider_rect.left - outline,
+                self.button_y - outline,
+                self.slider_rect.width + (outline * 2),
+                outline * 2,
+            ),
+            pygame.Rect(
+                self.slider_rect.right + self.button_radius / 2 + 5,
+                self.slider_rect.centery - (self.label_height / 2),
+                value_width,
+                self.label_height,
+            ),
+        ]).inflate(4, 4)
         
     def draw_slider(self, name):
         """Draw slider"""
@@ -171,11 +188,14 @@ class Slider:
     def draw_slider_value(self, value):
         """Render the current slider value"""
 
-        slider_value = self.font.render(
-            f"{value}", 
-            True, 
-            self.colors["yellow_cream"],
-        )
+        slider_value = self.value_glyphs.get(value)
+        if slider_value is None:
+            slider_value = self.font.render(
+                f"{value}", 
+                True, 
+                self.colors["yellow_cream"],
+            )
+            self.value_glyphs[value] = slider_value
         slider_value_rect = slider_value.get_rect()
         button_overhang = self.button_radius / 2 + 5
         adjusted_x = self.slider_rect.right + button_overhang
@@ -242,7 +262,7 @@ class ResetButton:
         self.screen = screen
         self.screen_rect = screen_rect
         self.colors = colors
-        self.font = pygame.font.SysFont("Menlo", 14, bold=True)
+        self.font = cached_font("Menlo", 14, bold=True)
         self.text = self.font.render(
             "RESET", 
             True, 
@@ -300,16 +320,106 @@ class ResetButton:
             )
             self.screen.blit(self.text, (adjusted_x, adjusted_y))
                 
+class ControlPanel:
+    """Cached layer holding the sliders and reset button"""
+
+    def __init__(self, screen, layer, sliders, reset, colors):
+        """Initialize panel attributes.
+        The widgets must draw onto layer, a screen-sized SRCALPHA surface
+        """
+
+        self.screen = screen
+        self.layer = layer
+        self.sliders = sliders
+        self.reset = reset
+        # Transparent text color, so antialiased glyph edges blended onto
+        # the empty layer keep their color instead of darkening
+        self.clear_color = pygame.Color(colors["yellow_cream"])
+        self.clear_color.a = 0
+        self.reset_rect = self.reset.button_rect.inflate(2, 2)
+        self.rect = self.reset_rect.unionall(
+            [slider.panel_rect for slider in self.sliders]
+        )
+        self.layer.fill(self.clear_color)
+        self.widget_states = {}
+
+    def update(self, active_slider, active_button):
+        """Re-render only the widgets whose look changed"""
+
+        for slider in self.sliders:
+            state = (
+                slider.button_x,
+                slider.name == active_slider,
+                modifiers[slider.name],
+            )
+            if self.widget_states.get(slider.name) != state:
+                self.layer.fill(self.clear_color, slider.panel_rect)
+                slider.draw_slider(active_slider)
+                slider.draw_slider_label()
+                slider.draw_slider_value(modifiers[slider.name])
+                self.widget_states[slider.name] = state
+        if self.widget_states.get("reset", ()) != active_button:
+            self.layer.fill(self.clear_color, self.reset_rect)
+            self.reset.draw_reset_button(active_button)
+            self.widget_states["reset"] = active_button
+
+    def draw(self):
+        """Composite the cached panel onto the screen in one blit"""
+
+        self.screen.blit(self.layer, self.rect.topleft, self.rect)
+
 class SeekAndFlee:
     """House game assets"""
 
-    def __init__(self):
-        """Initialize game attributes"""
+    def __init__(
+        self,
+        engine="scalar",
+        population=None,
+        physics_rate=REFERENCE_RATE,
+        render_rate=60,
+        max_substeps=8,
+        dirty_rects=False,
+        renderer="circles",
+        profile=False,
+        profile_out=None,
+        record=None,
+        trajectory=None,
+        threaded=False,
+        workers=None,
+        startup_report=False,
+        governor=False,
+        frame_budget=None,
+        lod=False,
+    ):
+        """Initialize game attributes.
+        engine="vectorized" steps all seekers through SeekerArrays, and
+        engine="tiled" splits them across workers processes;
+        population spawns that many seekers from the default three;
+        physics_rate and render_rate are independent steps/frames per second;
+        dirty_rects repaints and presents only the regions that changed;
+        renderer is "circles", "sprites" (batched blits) or "points";
+        profile times each phase of run_game ('p' shows the graph), and
+        profile_out streams the samples to a .jsonl or .csv file;
+        record logs every input that drives the world to that path;
+        trajectory streams every step's seeker states to that directory;
+        threaded steps the world on its own thread, so a slow present
+        never holds up physics;
+        startup_report prints how long each phase of startup took once
+        the first frame is on screen;
+        governor lowers quality in steps while frames take longer than
+        frame_budget seconds of work (default the render_rate's frame);
+        lod steps seekers far from the cursor less often
+        """
 
-        pygame.init()
+        self.startup = StartupTimer()
+        self.startup_report = startup_report
+        # Only the display: fonts load on first use through cached_font,
+        # and the game needs no audio or joystick subsystems
+        pygame.display.init()
         self.screen = pygame.display.set_mode((800, 800))
-        self.screen_rect = self.screen.get_rect()
         pygame.display.set_caption("SeekAndFlee")
+        self.startup.mark("display")
+        self.screen_rect = self.screen.get_rect()
         self.clock = pygame.time.Clock()
         self.colors = {
             "cream": pygame.Color('#fbf5ef'),
@@ -320,117 +430,419 @@ class SeekAndFlee:
             "night_sky": pygame.Color('#272744'),
         }
         self.mouse_circle_radius = 5
-        self.seekers = [
-            Seeker(x_pos=160, 
-                   y_pos=700, 
-                   color=self.colors["faded_purple"], 
-                   max_speed=12, 
-                   mass=100, 
-                   radius=30),
-            Seeker(x_pos=90, 
-                   y_pos=700, 
-                   color=self.colors["muted_orange"], 
-                   max_speed=12, 
-                   mass=60, 
-                   radius=20),
-            Seeker(x_pos=30, 
-                   y_pos=700, 
-                   color=self.colors["yellow_cream"], 
-                   max_speed=12,  
-                   mass=20, 
-                   radius=10),
-        ]
+        seekers = default_seekers(
+            self.colors,
+            population,
+            (self.screen_rect.width, self.screen_rect.height),
+        )
+        # The worker thread gets its own copy, fed through its queue
+        mods = Modifiers(modifiers) if threaded else modifiers
+        if engine == "tiled":
+            if record or trajectory:
+                raise ValueError(
+                    "record and trajectory need a single-process engine"
+                )
+            # Optional engines and sinks load only when chosen, keeping
+            # multiprocessing and friends out of every other startup
+            from tiled import TiledWorld
+            self.world = TiledWorld(
+                seekers,
+                workers=workers,
+                mods=mods,
+                physics_rate=physics_rate,
+            )
+        else:
+            self.world = SteeringWorld(
+                seekers,
+                engine=engine,
+                physics_rate=physics_rate,
+                mods=mods,
+            )
+        if lod and (record or engine == "tiled"):
+            raise ValueError("lod needs an unrecorded single process")
+        if record:
+            from replay import InputRecorder
+            self.world.recorder = InputRecorder(record, self.world)
+        if trajectory:
+            from trajectory import TrajectorySink
+            self.world.trajectory = TrajectorySink(
+                trajectory,
+                len(self.world.seekers),
+            )
+        self.timestep = FixedTimestep(self.world, max_substeps)
+        self.simulation = None
+        if threaded:
+            from simthread import SimulationThread
+            self.simulation = SimulationThread(self.world, max_substeps)
+        if lod:
+            if self.simulation is not None:
+                self.simulation.set_lod(LOD_BANDS)
+            else:
+                self.world.set_lod(LOD_BANDS)
+        self.render_rate = render_rate
+        self.frame_seconds = self.timestep.step_seconds
+        self.seekers = self.world.seekers
+        self.engine = engine
+        if self.engine == "vectorized":
+            self.seeker_arrays = self.world.seeker_arrays
+        self.startup.mark("world")
         self.edge_spacer = 15
+        self.ui_layer = pygame.Surface(
+            self.screen_rect.size,
+            pygame.SRCALPHA,
+        )
         self.sliders = [
             Slider(name="max_speed",
-                   screen=self.screen, 
+                   screen=self.ui_layer, 
                    x_pos=self.edge_spacer,
                    sliders_index=0, 
                    init_lut_index=4, 
                    colors=self.colors),
             Slider(name="mass",
-                   screen=self.screen,
+                   screen=self.ui_layer,
                    x_pos=self.edge_spacer,
                    sliders_index=1,
                    init_lut_index=4,
                    colors=self.colors),
             Slider(name="responsiveness",
-                   screen=self.screen,
+                   screen=self.ui_layer,
                    x_pos=self.edge_spacer,
                    sliders_index=2,
                    init_lut_index=3,
                    colors=self.colors),                   
             Slider(name="max_force",
-                   screen=self.screen,
+                   screen=self.ui_layer,
                    x_pos=self.edge_spacer,
                    sliders_index=3,
                    init_lut_index=3,
                    colors=self.colors),
             Slider(name="flee_distance",
-                   screen=self.screen,
+                   screen=self.ui_layer,
                    x_pos=self.edge_spacer,
                    sliders_index=4,
                    init_lut_index=4,
                    colors=self.colors),
             Slider(name="calm_buffer",
-                   screen=self.screen,
+                   screen=self.ui_layer,
                    x_pos=self.edge_spacer,
                    sliders_index=5,
                    init_lut_index=1,
                    colors=self.colors),
         ]
         self.reset = ResetButton(
-            screen=self.screen, 
+            screen=self.ui_layer, 
             screen_rect=self.screen_rect, 
             edge_spacer=self.edge_spacer, 
             colors=self.colors,
         )
+        self.panel = ControlPanel(
+            self.screen,
+            self.ui_layer,
+            self.sliders,
+            self.reset,
+            self.colors,
+        )
+        self.startup.mark("ui")
         self.mode = Mode.SEEK
         self.active_slider = None
         self.active_button = None
         self.sync_ui = False
+        self.seeker_radii = [seeker.radius for seeker in self.seekers]
+        self.dirty_rects = None
+        if dirty_rects:
+            self.dirty_rects = DirtyRectTracker(self.screen_rect)
+        self.profiler = NullProfiler()
+        self.overlay = None
+        if profile or profile_out:
+            self.profiler = FrameProfiler(
+                sink=FrameSink(profile_out) if profile_out else None,
+            )
+            set_active_profiler(self.profiler)
+        self.show_overlay = False
+        # Point writes are already as cheap as one blit of the layer
+        self.sleeper_layer = None
+        if renderer != "points":
+            self.sleeper_layer = SleeperLayer(
+                self.screen,
+                self.colors["night_sky"],
+            )
+        self.renderer = renderer
+        self.sprite_batch = None
+        self.sprite_batches = {}
+        self._set_renderer(renderer)
+        self.startup.mark("renderers")
+        self.max_substeps = max_substeps
+        self.ui_stride = 1
+        self.frames = 0
+        self.governor = None
+        if governor:
+            self.governor = FrameGovernor(frame_budget or 1 / render_rate)
    
     def run_game(self):
         """Hold the game loop"""
 
-        while True:
-            self._check_events()
-            self.mouse_pos = pygame.mouse.get_pos()
+        profiler = self.profiler
+        try:
+            if self.simulation is not None:
+                self.simulation.start()
+            while True:
+                frame_start = time.perf_counter()
+                profiler.begin_frame()
+                with profiler.section("events"):
+                    self._check_events()
+                self.mouse_pos = pygame.mouse.get_pos()
+                with profiler.section("update"):
+                    self._update_seekers(self.mode)
+                with profiler.section("ui"):
+                    if self.sync_ui:
+                        for slider in self.sliders:
+                            slider.sync_ui()
+                        self.sync_ui = False
+                    for slider in self.sliders:
+                        new_global = slider._check_buttons(
+                            self.active_slider,
+                            self.mouse_pos,
+                        )
+                        if new_global is not None:
+                            self._change_global(new_global)
+                    if self.frames % self.ui_stride == 0:
+                        self.panel.update(
+                            self.active_slider,
+                            self.active_button,
+                        )
+                positions, asleep = self._render_state()
+                if self.dirty_rects is None:
+                    self._draw_frame(positions, asleep)
+                    with profiler.section("present"):
+                        pygame.display.flip()
+                else:
+                    self._draw_dirty_frame(positions, asleep)
+                if self.governor is not None:
+                    level = self.governor.record(
+                        time.perf_counter() - frame_start
+                    )
+                    if level is not None:
+                        self._apply_quality(level)
+                self.frames += 1
+                with profiler.section("idle"):
+                    self.frame_seconds = (
+                        self.clock.tick(self.render_rate) / 1000
+                    )
+                profiler.end_frame()
+                if self.startup_report:
+                    self.startup.mark("first frame")
+                    print(self.startup.report(), file=sys.stderr)
+                    self.startup_report = False
+        finally:
+            self._shutdown()
+
+    def _apply_quality(self, level):
+        """Make every cut a FrameGovernor level calls for, and undo the
+        ones above it
+        """
+
+        # lazy_ui: re-render the control panel every fourth frame
+        self.ui_stride = 4 if level >= 1 else 1
+        # cheap_draw: circles become sprites and sprites become points
+        renderer = self.renderer
+        if level >= 2:
+            renderer = CHEAPER_RENDERERS.get(renderer, renderer)
+        self._set_renderer(renderer)
+        # offscreen_stride: seekers off the screen step every other step;
+        # recorded runs have to replay exactly, so they keep every step
+        stride = 2 if level >= 3 else 1
+        if self.world.recorder is None and hasattr(
+            self.world,
+            "set_offscreen_stride",
+        ):
+            if self.simulation is not None:
+                self.simulation.set_offscreen_stride(stride)
+            else:
+                self.world.set_offscreen_stride(stride)
+        # few_substeps: drop more backlog instead of catching up on it
+        substeps = self.max_substeps
+        if level >= 4:
+            substeps = max(1, substeps // 4)
+        self.timestep.max_substeps = substeps
+        if self.simulation is not None:
+            self.simulation.max_substeps = substeps
+        caption = "SeekAndFlee"
+        if level:
+            caption += f" [quality: {self.governor.name}]"
+        pygame.display.set_caption(caption)
+
+    def _set_renderer(self, renderer):
+        """Draw seekers with renderer, building its batch on first use"""
+
+        batch = None
+        if renderer != "circles":
+            batch = self.sprite_batches.get(renderer)
+            if batch is None:
+                batch = self.sprite_batches[renderer] = SpriteBatch(
+                    [seeker.color for seeker in self.seekers],
+                    self.seeker_radii,
+                    mode=renderer,
+                )
+        if batch is self.sprite_batch:
+            return
+        self.sprite_batch = batch
+        if self.sleeper_layer is not None:
+            self.sleeper_layer.invalidate()
+        if self.dirty_rects is not None:
+            self.dirty_rects.reset()
+
+    def _build_overlay(self):
+        """Profiler graph, built the first time it is shown"""
+
+        return ProfilerOverlay(
+            self.profiler,
+            cached_font("Menlo", 12, bold=True),
+            (self.screen_rect.right - 250, self.edge_spacer, 240, 160),
+            [
+                self.colors["yellow_cream"],
+                self.colors["muted_orange"],
+                self.colors["faded_purple"],
+                self.colors["cream"],
+                self.colors["blue_gray"],
+            ],
+        )
+
+    def _render_state(self):
+        """Positions to draw this frame and which seekers are asleep,
+        from the world or, when threaded, its latest snapshot
+        """
+
+        as_array = self.sprite_batch is not None
+        if self.simulation is None:
+            positions = self.world.render_positions(
+                self.timestep.alpha,
+                as_array=as_array,
+            )
+            return positions, self.world.asleep
+        positions, asleep = self.simulation.latest()
+        return positions if as_array else positions.tolist(), asleep
+
+    def _draw_frame(self, positions, asleep=None):
+        """Repaint the whole screen"""
+
+        if asleep is None:
+            asleep = self.world.asleep
+        with self.profiler.section("draw_seekers"):
             self.screen.fill(self.colors["night_sky"])
-            self._update_seekers(self.mode)
-            self._draw_seekers()
-            if self.sync_ui:
-                for slider in self.sliders:
-                    slider.sync_ui()
-                self.sync_ui = False
-            for slider in self.sliders:
-                new_global = slider._check_buttons(
-                    self.active_slider,
-                    self.mouse_pos,
+            layer = self.sleeper_layer
+            if layer is not None and layer.active(asleep):
+                layer.refresh(
+                    asleep,
+                    lambda surface, indices: self._draw_seekers(
+                        positions,
+                        indices,
+                        surface,
+                    ),
                 )
-                if new_global is not None:
-                    self._change_global(new_global)
-                slider.draw_slider(self.active_slider)
-                slider.draw_slider_label()
-                slider.draw_slider_value(modifiers[slider.name])
-                self._draw_mouse_circle(self.mode)
-            self.reset.draw_reset_button(self.active_button)
-            pygame.display.flip()
-            self.clock.tick(60)
-  
+                layer.draw(self.screen)
+                self._draw_seekers(positions, layer.awake(asleep))
+            else:
+                self._draw_seekers(positions)
+        with self.profiler.section("ui"):
+            self.panel.draw()
+        self._draw_mouse_circle(self.mode)
+        if self.show_overlay:
+            with self.profiler.section("overlay"):
+                self.overlay.draw(self.screen)
+
+    def _draw_dirty_frame(self, positions, asleep=None):
+        """Repaint and present only the rects that changed"""
+
+        tracker = self.dirty_rects
+        seeker_rects = tracker.seeker_rects(positions, self.seeker_radii)
+        # What the panel shows, which can lag the inputs when the
+        # governor skips panel updates
+        for slider in self.sliders:
+            tracker.mark_item(
+                slider.name,
+                slider.panel_rect,
+                self.panel.widget_states.get(slider.name),
+            )
+        tracker.mark_item(
+            "reset",
+            self.reset.button_rect,
+            self.panel.widget_states.get("reset"),
+        )
+        tracker.mark_item(
+            "mouse",
+            self._mouse_circle_rect(),
+            self.mode,
+        )
+        if self.show_overlay:
+            tracker.mark_item(
+                "overlay",
+                self.overlay.rect,
+                self.profiler.frame,
+            )
+        dirty = tracker.collect(seeker_rects)
+        if dirty is None:
+            self._draw_frame(positions, asleep)
+            with self.profiler.section("present"):
+                pygame.display.flip()
+            return
+        with self.profiler.section("draw_seekers"):
+            for rect in dirty:
+                self.screen.set_clip(rect)
+                self.screen.fill(self.colors["night_sky"], rect)
+                self._draw_seekers(
+                    positions,
+                    tracker.overlapping(seeker_rects, rect),
+                )
+                if self.panel.rect.colliderect(rect):
+                    self.panel.draw()
+                if self._mouse_circle_rect().colliderect(rect):
+                    self._draw_mouse_circle(self.mode)
+                if self.show_overlay and self.overlay.rect.colliderect(rect):
+                    self.overlay.draw(self.screen)
+            self.screen.set_clip(None)
+        with self.profiler.section("present"):
+            pygame.display.update(dirty)
+
     def _check_events(self):
         """Check for keypresses and mouse clicks"""
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                sys.exit()
+                self._quit()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_q:
-                    sys.exit()
+                    self._quit()
+                elif event.key == pygame.K_p and self.profiler.enabled:
+                    if self.overlay is None:
+                        self.overlay = self._build_overlay()
+                    self.show_overlay = not self.show_overlay
+                    if self.dirty_rects is not None:
+                        self.dirty_rects.reset()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self._mouse_press()
             elif event.type == pygame.MOUSEBUTTONUP:
                 self._mouse_release()
+            elif event.type == pygame.WINDOWEXPOSED:
+                if self.dirty_rects is not None:
+                    self.dirty_rects.reset()
+
+    def _quit(self):
+        """Leave the game loop; run_game cleans up on the way out"""
+
+        sys.exit()
+
+    def _shutdown(self):
+        """Flush profiler output and stop workers, threads and sinks"""
+
+        self.profiler.close()
+        if self.simulation is not None:
+            self.simulation.stop()
+        if self.engine == "tiled":
+            self.world.close()
+        if self.world.recorder is not None:
+            self.world.recorder.close(self.world)
+        if self.world.trajectory is not None:
+            self.world.trajectory.close()
 
     def _mouse_press(self):
         """Allow the mouse to move the button"""
@@ -468,12 +880,26 @@ class SeekAndFlee:
 
         name, lut_index = change
         modifiers[name] = SLIDER_LUTS[name][lut_index]
+        if self.simulation is not None:
+            self.simulation.set_modifiers({name: modifiers[name]})
 
     def _reset_globals(self):
         """Reset modifiers values to INITIAL_MODIFIERS"""
 
         modifiers.clear()
         modifiers.update(INITIAL_MODIFIERS)
+        if self.simulation is not None:
+            self.simulation.set_modifiers(INITIAL_MODIFIERS)
+
+    def _mouse_circle_rect(self):
+        """Bounding rect of the cursor circle"""
+
+        return pygame.Rect(
+            self.mouse_pos[0] - self.mouse_circle_radius - 1,
+            self.mouse_pos[1] - self.mouse_circle_radius - 1,
+            (self.mouse_circle_radius * 2) + 3,
+            (self.mouse_circle_radius * 2) + 3,
+        )
 
     def _draw_mouse_circle(self, mode):
         """Draw a circle at the cursor's current location"""
@@ -495,207 +921,137 @@ class SeekAndFlee:
             )
 
     def _update_seekers(self, mode):
-        """Apply the speed and target forces to update position.
-        This is where the Reynolds steering philosophy is implemented
-        On every frame, each agent must:
-        1. Sense its surroundings
-        2. Use gathered sense data to generate steering desires
-        3. Blend those desires into one discrete step
-        4. Apply that step according to the defined physics of the world
+        """Feed the cursor and mode to the world and catch it up
+        to the time the last frame took; when threaded, just queue them
         """
 
-        if mode == Mode.SEEK:
-            for seeker in self.seekers:
-                (
-                    effective_max_speed,
-                    effective_max_force,
-                    slowing_distance,
-                ) = self._recalculate_effective_values(seeker)
-                xy_diff = (
-                    (self.mouse_pos[0] - seeker.x_pos), 
-                    (self.mouse_pos[1] - seeker.y_pos)
-                )
-                displacement_vector = pygame.Vector2(xy_diff)
-                distance = displacement_vector.length()
-                if distance >= 1:                
-                    ramped_speed = (
-                        effective_max_speed 
-                        * (distance / slowing_distance)
-                    )
-                    clipped_speed = min(
-                        ramped_speed, 
-                        effective_max_speed
-                    )
-                    displacement_vector.normalize_ip()
-                    desired_velocity = (
-                        displacement_vector 
-                        * clipped_speed
-                    )
-                    self._apply_steering(
-                        seeker, 
-                        desired_velocity, 
-                        effective_max_force, 
-                        effective_max_speed,
-                    )
-                else:
-                    desired_velocity = pygame.Vector2()
-                    self._apply_steering(
-                        seeker, 
-                        desired_velocity, 
-                        effective_max_force, 
-                        effective_max_speed,
-                    )
-        else:
-            for seeker in self.seekers:
-                (
-                    effective_max_speed,
-                    effective_max_force,
-                    slowing_distance,
-                ) = self._recalculate_effective_values(seeker)
-                flee_distance = modifiers["flee_distance"]
-                calm_distance = (
-                    flee_distance 
-                    * modifiers["calm_buffer"]
-                )
-                mouse_xy_diff = (
-                    (self.mouse_pos[0] - seeker.x_pos),
-                    (self.mouse_pos[1] - seeker.y_pos)
-                )
-                mouse_displacement_vector = pygame.Vector2(mouse_xy_diff)
-                mouse_distance = mouse_displacement_vector.length()
-                if seeker.state == SeekerState.RETURNING:
-                    if mouse_distance <= flee_distance:
-                        seeker.state = SeekerState.FLEEING
-                if seeker.state == SeekerState.FLEEING:
-                    if mouse_distance >= calm_distance:
-                        seeker.state = SeekerState.RETURNING
-
-                if seeker.state == SeekerState.FLEEING:
-                    desired_velocity = self._determine_fleeing_target(
-                        flee_distance,
-                        mouse_displacement_vector,
-                        seeker,
-                        effective_max_speed,
-                    )
-                    self._apply_steering(
-                        seeker, 
-                        desired_velocity, 
-                        effective_max_force, 
-                        effective_max_speed,
-                    )
-                    
-                elif seeker.state == SeekerState.RETURNING:
-                    center_point = (400,400)
-                    xy_diff = (
-                        (center_point[0] - seeker.x_pos), 
-                        (center_point[1] - seeker.y_pos),
-                    )
-                    displacement_vector = pygame.Vector2(xy_diff)
-                    distance = displacement_vector.length()
-                    if distance >= 1:                
-                        ramped_speed = (
-                            effective_max_speed 
-                            * (distance / slowing_distance)
-                        )
-                        clipped_speed = min(
-                            ramped_speed, 
-                            effective_max_speed,
-                        )
-                        displacement_vector.normalize_ip()
-                        desired_velocity = (
-                            displacement_vector 
-                            * clipped_speed
-                        )
-                        self._apply_steering(
-                            seeker, 
-                            desired_velocity, 
-                            effective_max_force, 
-                            effective_max_speed,
-                        )
-                    else:
-                        desired_velocity = pygame.Vector2() 
-                        self._apply_steering(
-                            seeker, 
-                            desired_velocity, 
-                            effective_max_force, 
-                            effective_max_speed,
-                        )
+        if self.simulation is not None:
+            self.simulation.set_target(self.mouse_pos)
+            self.simulation.set_mode(mode)
+            return
+        self.world.set_target(self.mouse_pos)
+        self.world.mode = mode
+        self.timestep.advance(self.frame_seconds)
 
-    def _recalculate_effective_values(self, seeker):
-        """Recalculate values that need current GLOBALs"""
-
-        effective_max_speed = seeker.max_speed * modifiers["max_speed"]
-        effective_mass = seeker.mass * modifiers["mass"]
-        response_time = effective_mass / modifiers["responsiveness"]
-        effective_max_force = (
-            (effective_max_speed / response_time) 
-            * modifiers["max_force"]
-        )
-        slowing_distance = (
-            (effective_max_speed ** 2) 
-            / (effective_max_force * 2)
-        )
-        return (effective_max_speed, effective_max_force, slowing_distance)
-
-    def _determine_fleeing_target(
-        self,
-        flee_distance,
-        mouse_displacement_vector,
-        seeker,
-        effective_max_speed,
-    ):
-        """Determine a new target point for fleeing behavior"""
-
-        fleeing_target_distance = flee_distance * 2
-        flipped_mouse_vector = mouse_displacement_vector.rotate(180)
-        if flipped_mouse_vector.length() > 0:
-            normalized_flipped_vector = flipped_mouse_vector.normalize()
-        elif seeker.velocity.length() > 0:
-            normalized_flipped_vector = seeker.velocity.normalize()
-        else:
-            normalized_flipped_vector = pygame.Vector2(1, 0)
-        fleeing_target_point = (
-            pygame.Vector2(seeker.x_pos, seeker.y_pos)
-            + (normalized_flipped_vector * fleeing_target_distance)
-        )
-        xy_diff = (
-            (fleeing_target_point[0] - seeker.x_pos), 
-            (fleeing_target_point[1] - seeker.y_pos)
-        )
-        displacement_vector = pygame.Vector2(xy_diff)
-        displacement_vector.normalize_ip()
-        desired_velocity = displacement_vector * effective_max_speed
-        return desired_velocity
-
-    def _apply_steering(
-            self, 
-            seeker, 
-            desired_velocity, 
-            effective_max_force, 
-            effective_max_speed
-        ):
-        """Use a desired_velocity and physics constraints to increment position"""
-
-        steering_force = desired_velocity - seeker.velocity
-        if abs(steering_force.length()) > effective_max_force:
-            steering_force.scale_to_length(effective_max_force)
-        seeker.velocity += steering_force
-        if abs(seeker.velocity.length()) > effective_max_speed:
-            seeker.velocity.scale_to_length(effective_max_speed)
-        seeker.x_pos += seeker.velocity.x
-        seeker.y_pos += seeker.velocity.y
-                
-    def _draw_seekers(self):
-        """Draw seekers at their current location"""
+    def _draw_seekers(self, positions=None, indices=None, surface=None):
+        """Draw seekers at their current location.
+        indices limits drawing to a subset, in seeker order;
+        surface defaults to the screen
+        """
 
-        for seeker in self.seekers:
+        if positions is None:
+            positions = self.world.render_positions(
+                self.timestep.alpha,
+                as_array=self.sprite_batch is not None,
+            )
+        if surface is None:
+            surface = self.screen
+        if self.sprite_batch is not None:
+            self.sprite_batch.draw(surface, positions, indices)
+            return
+        if indices is None:
+            indices = range(len(self.seekers))
+        for index in indices:
+            seeker = self.seekers[index]
             pygame.draw.circle(
-                self.screen,
+                surface,
                 seeker.color,
-                (seeker.x_pos, seeker.y_pos),
+                positions[index],
                 seeker.radius,
             )
 
 if __name__ == '__main__':
-    s = SeekAndFlee()
+    parser = argparse.ArgumentParser(description="Reynolds seek and flee")
+    parser.add_argument(
+        "--engine",
+        choices=("scalar", "vectorized", "tiled"),
+        default="scalar",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes for the tiled engine (default: one per CPU)",
+    )
+    parser.add_argument("--population", type=int, default=None)
+    parser.add_argument(
+        "--physics-rate",
+        type=float,
+        default=REFERENCE_RATE,
+    )
+    parser.add_argument("--render-rate", type=int, default=60)
+    parser.add_argument("--max-substeps", type=int, default=8)
+    parser.add_argument("--dirty-rects", action="store_true")
+    parser.add_argument(
+        "--renderer",
+        choices=("circles", "sprites", "points"),
+        default="circles",
+    )
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument(
+        "--profile-out",
+        default=None,
+        help="stream per-frame phase timings to a .jsonl or .csv file",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="log target, mode and modifier inputs for replay.py",
+    )
+    parser.add_argument(
+        "--trajectory",
+        default=None,
+        metavar="DIR",
+        help="stream every step's positions, velocities and states to DIR",
+    )
+    parser.add_argument(
+        "--threaded",
+        action="store_true",
+        help="step the simulation on its own thread",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print how long each phase of startup took",
+    )
+    parser.add_argument(
+        "--lod",
+        action="store_true",
+        help="step seekers far from the cursor less often",
+    )
+    parser.add_argument(
+        "--governor",
+        action="store_true",
+        help="lower quality in steps while frames run over budget",
+    )
+    parser.add_argument(
+        "--frame-budget",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="frame work time the governor aims for "
+        "(default: one frame at --render-rate)",
+    )
+    args = parser.parse_args()
+    s = SeekAndFlee(
+        engine=args.engine,
+        population=args.population,
+        physics_rate=args.physics_rate,
+        render_rate=args.render_rate,
+        max_substeps=args.max_substeps,
+        dirty_rects=args.dirty_rects,
+        renderer=args.renderer,
+        profile=args.profile,
+        profile_out=args.profile_out,
+        record=args.record,
+        trajectory=args.trajectory,
+        threaded=args.threaded,
+        workers=args.workers,
+        startup_report=args.startup_report,
+        governor=args.governor,
+        lod=args.lod,
+        frame_budget=(
+            args.frame_budget / 1000 if args.frame_budget else None
+        ),
+    )
     s.run_game()
\ No newline at end of file
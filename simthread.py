@@ -0,0 +1,218 @@
+import time
+import threading
+from collections import deque
+import numpy as np
+from world import FixedTimestep
+
+class WorldSnapshot:
+    """One published physics state, held in preallocated arrays that the
+    worker refills in place. Read it only under SimulationThread.lock
+    """
+
+    __slots__ = (
+        "frame",
+        "pos",
+        "previous_pos",
+        "asleep",
+        "published",
+        "step_seconds",
+    )
+
+    def __init__(self, population, step_seconds):
+        """Initialize snapshot attributes and allocate its arrays"""
+
+        self.frame = 0
+        self.pos = np.zeros((population, 2))
+        self.previous_pos = np.zeros((population, 2))
+        self.asleep = np.zeros(population, dtype=bool)
+        self.published = time.perf_counter()
+        self.step_seconds = step_seconds
+
+    def fill(self, frame, pos, previous_pos, asleep):
+        """Copy a new state into this snapshot's arrays"""
+
+        self.frame = frame
+        np.copyto(self.pos, pos)
+        np.copyto(self.previous_pos, previous_pos)
+        np.copyto(self.asleep, asleep)
+        self.published = time.perf_counter()
+
+    @property
+    def alpha(self):
+        """How far real time has moved toward the next step, at most 1"""
+
+        elapsed = time.perf_counter() - self.published
+        return min(elapsed / self.step_seconds, 1.0)
+
+    def positions(self, alpha=None):
+        """(N, 2) positions blended from the previous published state.
+        This lags the simulation by up to one step, like FixedTimestep
+        """
+
+        if alpha is None:
+            alpha = self.alpha
+        if alpha >= 1:
+            return self.pos
+        return self.previous_pos + (self.pos - self.previous_pos) * alpha
+
+class SimulationThread:
+    """Step a SteeringWorld on a worker thread at its own fixed rate.
+    The event loop sends target, mode and modifier changes through a
+    deque, whose append and popleft are atomic, so it never waits on
+    the simulation. A FixedTimestep keeps the worker's clock. After each
+    batch of steps the worker fills the idle one of two preallocated
+    WorldSnapshots and swaps it in under the lock; the render thread
+    copies what it draws out of the current one under the same lock.
+    Once started, the world is the worker's; change it only through the
+    input methods
+    """
+
+    def __init__(self, world, max_substeps=8):
+        """Initialize thread attributes and publish the starting state"""
+
+        self.world = world
+        self.timestep = FixedTimestep(
+            world,
+            max_substeps,
+            interpolate=False,
+        )
+        self.step_seconds = self.timestep.step_seconds
+        self.inputs = deque()
+        self.steps = 0
+        self.error = None
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        population = len(world.asleep)
+        self.snapshot = WorldSnapshot(population, self.step_seconds)
+        self.idle = WorldSnapshot(population, self.step_seconds)
+        pos = self.world.render_positions(as_array=True)
+        self.snapshot.fill(world.frame, pos, pos, world.asleep)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def max_substeps(self):
+        """Most steps the worker runs to catch up in one go"""
+
+        return self.timestep.max_substeps
+
+    @max_substeps.setter
+    def max_substeps(self, value):
+        """Change the catch-up limit; the worker reads it every tick"""
+
+        self.timestep.max_substeps = value
+
+    @property
+    def dropped_steps(self):
+        """Steps the worker skipped rather than fall further behind"""
+
+        return self.timestep.dropped_steps
+
+    def start(self):
+        """Start stepping in the background"""
+
+        self.thread.start()
+        return self
+
+    def set_target(self, target):
+        """Queue a new target point"""
+
+        self.inputs.append(("target", tuple(target)))
+
+    def set_mode(self, mode):
+        """Queue a new Mode"""
+
+        self.inputs.append(("mode", mode))
+
+    def set_modifiers(self, values):
+        """Queue new values for some modifiers"""
+
+        self.inputs.append(("modifiers", dict(values)))
+
+    def set_offscreen_stride(self, stride):
+        """Queue a new SteeringWorld.set_offscreen_stride"""
+
+        self.inputs.append(("offscreen_stride", stride))
+
+    def set_lod(self, bands):
+        """Queue a new SteeringWorld.set_lod"""
+
+        self.inputs.append(("lod", bands))
+
+    def latest(self, alpha=None):
+        """Copies of the newest positions, interpolated like
+        WorldSnapshot.positions, and asleep flags; re-raises a worker
+        failure
+        """
+
+        if self.error is not None:
+            raise self.error
+        with self.lock:
+            snapshot = self.snapshot
+            return (
+                np.array(snapshot.positions(alpha)),
+                snapshot.asleep.copy(),
+            )
+
+    def stop(self):
+        """Stop the worker and wait for its current step to finish"""
+
+        self.stopping.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _apply_inputs(self):
+        """Hand every queued input to the world, oldest first"""
+
+        world = self.world
+        inputs = self.inputs
+        while inputs:
+            kind, value = inputs.popleft()
+            if kind == "target":
+                world.set_target(value)
+            elif kind == "mode":
+                world.mode = value
+            elif kind == "offscreen_stride":
+                world.set_offscreen_stride(value)
+            elif kind == "lod":
+                world.set_lod(value)
+            else:
+                for name, modifier in value.items():
+                    world.modifiers[name] = modifier
+
+    def _publish(self):
+        """Fill the idle snapshot from the world and swap it in. Only the
+        worker writes snapshots, so it reads the current one unlocked
+        """
+
+        idle = self.idle
+        idle.fill(
+            self.world.frame,
+            self.world.render_positions(as_array=True),
+            self.snapshot.pos,
+            self.world.asleep,
+        )
+        with self.lock:
+            self.idle = self.snapshot
+            self.snapshot = idle
+
+    def _run(self):
+        """Worker thread: step on schedule until told to stop"""
+
+        timestep = self.timestep
+        last = time.perf_counter()
+        try:
+            while not self.stopping.is_set():
+                self._apply_inputs()
+                now = time.perf_counter()
+                steps = timestep.advance(now - last)
+                last = now
+                if steps:
+                    self.steps += steps
+                    self._publish()
+                wait = timestep.step_seconds - timestep.accumulator
+                if wait > 0:
+                    self.stopping.wait(wait)
+        except Exception as error:
+            self.error = error
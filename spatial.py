@@ -0,0 +1,233 @@
+import numpy as np
+
+def _expand_ranges(starts, stops):
+    """Concatenate arange(start, stop) for every pair, vectorized"""
+
+    counts = stops - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.intp)
+    ends = np.cumsum(counts)
+    return (
+        np.arange(total)
+        - np.repeat(ends - counts, counts)
+        + np.repeat(starts, counts)
+    )
+
+class UniformGrid:
+    """Uniform grid index over 2D points.
+    rebuild() buckets every point by cell with one argsort, so queries
+    only look at points in the cells a search circle overlaps
+    """
+
+    def __init__(self, cell_size):
+        """Initialize grid attributes"""
+
+        self.cell_size = float(cell_size)
+        self.positions = np.empty((0, 2))
+        self.order = np.empty(0, dtype=np.intp)
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+        self.origin = np.zeros(2, dtype=np.int64)
+        self.shape = (0, 0)
+
+    def __len__(self):
+        """Number of indexed points"""
+
+        return len(self.positions)
+
+    def rebuild(self, positions):
+        """Re-bucket every point; row i of positions is point i"""
+
+        self.positions = np.asarray(positions)
+        if not len(self.positions):
+            self.order = np.empty(0, dtype=np.intp)
+            self.sorted_keys = np.empty(0, dtype=np.int64)
+            self.shape = (0, 0)
+            return
+        cells = np.floor(self.positions / self.cell_size).astype(np.int64)
+        # One empty cell of padding on every side keeps neighbor
+        # columns from wrapping into each other
+        self.origin = cells.min(axis=0) - 1
+        cells -= self.origin
+        self.shape = tuple((cells.max(axis=0) + 2).tolist())
+        keys = cells[:, 0] * self.shape[1] + cells[:, 1]
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def _cells_of(self, points):
+        """Grid cell coordinates for an (N, 2) array of points"""
+
+        return (
+            np.floor(np.asarray(points) / self.cell_size).astype(np.int64)
+            - self.origin
+        )
+
+    def _candidates(self, cell_x, cell_y, reach):
+        """Sorted slots of points in the square of cells around each
+        (cell_x, cell_y), plus which query each slot belongs to
+        """
+
+        return self._spans(
+            cell_x,
+            cell_y,
+            [(dx, -reach, reach) for dx in range(-reach, reach + 1)],
+        )
+
+    def _ring(self, cell_x, cell_y, reach):
+        """Like _candidates, but only the cells exactly reach away"""
+
+        if reach == 0:
+            return self._candidates(cell_x, cell_y, 0)
+        spans = [(-reach, -reach, reach), (reach, -reach, reach)]
+        for dx in range(1 - reach, reach):
+            spans.append((dx, -reach, -reach))
+            spans.append((dx, reach, reach))
+        return self._spans(cell_x, cell_y, spans)
+
+    def _spans(self, cell_x, cell_y, spans):
+        """Sorted slots and owning queries for column spans of cells.
+        Each span is (dx, dy_low, dy_high) relative to the query's cell
+        """
+
+        width, height = self.shape
+        queries = np.arange(len(cell_x))
+        slots = []
+        owners = []
+        for dx, dy_low, dy_high in spans:
+            column = cell_x + dx
+            y_low = np.maximum(cell_y + dy_low, 0)
+            y_high = np.minimum(cell_y + dy_high, height - 1)
+            valid = (column >= 0) & (column < width) & (y_low <= y_high)
+            if not valid.any():
+                continue
+            column = column[valid]
+            starts = np.searchsorted(
+                self.sorted_keys,
+                column * height + y_low[valid],
+                side="left",
+            )
+            stops = np.searchsorted(
+                self.sorted_keys,
+                column * height + y_high[valid],
+                side="right",
+            )
+            slots.append(_expand_ranges(starts, stops))
+            owners.append(np.repeat(queries[valid], stops - starts))
+        if not slots:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        return np.concatenate(slots), np.concatenate(owners)
+
+    def query_radius(self, point, radius):
+        """Indices of points within radius of point"""
+
+        if not len(self.positions):
+            return np.empty(0, dtype=np.intp)
+        cell = self._cells_of([point])
+        reach = int(np.ceil(radius / self.cell_size))
+        slots, _ = self._candidates(cell[:, 0], cell[:, 1], reach)
+        candidates = self.order[slots]
+        offset = self.positions[candidates] - point
+        inside = np.einsum("ij,ij->i", offset, offset) <= radius * radius
+        return candidates[inside]
+
+    def query_radius_many(self, points, radius):
+        """(query, index) pairs: every indexed point within radius of
+        each row of points, for all queries at once
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if not len(self.positions) or not len(points):
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        cells = self._cells_of(points)
+        reach = int(np.ceil(radius / self.cell_size))
+        slots, owners = self._candidates(cells[:, 0], cells[:, 1], reach)
+        candidates = self.order[slots]
+        offset = self.positions[candidates] - points[owners]
+        inside = np.einsum("ij,ij->i", offset, offset) <= radius * radius
+        return owners[inside], candidates[inside]
+
+    def query_nearest_many(self, points, max_radius):
+        """Nearest indexed point to each row of points, and its distance.
+        Rows with nothing within max_radius get index -1 and distance inf.
+        Searches grow one ring of cells at a time and stop per query once
+        no unsearched cell can hold anything closer, so cost follows the
+        local threat density rather than the total count
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        nearest = np.full(len(points), -1, dtype=np.intp)
+        if not len(self.positions) or not len(points):
+            return nearest, np.full(len(points), np.inf)
+        cells = self._cells_of(points)
+        # Distance from each point to the nearest edge of its own cell
+        inside = points / self.cell_size - np.floor(points / self.cell_size)
+        margin = np.minimum(inside, 1 - inside).min(axis=1) * self.cell_size
+        best_sq = np.full(len(points), np.inf)
+        open_queries = np.arange(len(points))
+        max_reach = int(np.ceil(max_radius / self.cell_size))
+        for reach in range(max_reach + 1):
+            slots, owners = self._ring(
+                cells[open_queries, 0],
+                cells[open_queries, 1],
+                reach,
+            )
+            if len(slots):
+                owners = open_queries[owners]
+                candidates = self.order[slots]
+                offset = self.positions[candidates] - points[owners]
+                length_sq = np.einsum("ij,ij->i", offset, offset)
+                np.minimum.at(best_sq, owners, length_sq)
+                best = length_sq == best_sq[owners]
+                nearest[owners[best]] = candidates[best]
+            # Nothing unsearched is closer than the searched square's edge
+            reach_sq = (reach * self.cell_size + margin[open_queries]) ** 2
+            open_queries = open_queries[best_sq[open_queries] > reach_sq]
+            if not len(open_queries):
+                break
+        distance = np.sqrt(best_sq)
+        outside = distance > max_radius
+        nearest[outside] = -1
+        distance[outside] = np.inf
+        return nearest, distance
+
+    def query_knn(self, point, k):
+        """Indices of the k points nearest to point, nearest first"""
+
+        k = min(k, len(self.positions))
+        if k == 0:
+            return np.empty(0, dtype=np.intp)
+        span = self.cell_size * max(self.shape)
+        radius = self.cell_size
+        while True:
+            candidates = self.query_radius(point, radius)
+            if len(candidates) >= k or radius > span:
+                break
+            radius *= 2
+        offset = self.positions[candidates] - point
+        distance_sq = np.einsum("ij,ij->i", offset, offset)
+        nearest = np.argsort(distance_sq, kind="stable")[:k]
+        return candidates[nearest]
+
+    def pairs_within(self, radius):
+        """Every ordered pair (i, j), i != j, at most radius apart"""
+
+        if not len(self.positions):
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        # Work in sorted order so gathers walk memory mostly in sequence
+        sorted_positions = self.positions[self.order]
+        sorted_cells = self._cells_of(sorted_positions)
+        reach = int(np.ceil(radius / self.cell_size))
+        slots, owners = self._candidates(
+            sorted_cells[:, 0],
+            sorted_cells[:, 1],
+            reach,
+        )
+        offset = sorted_positions[slots] - sorted_positions[owners]
+        close = (
+            (np.einsum("ij,ij->i", offset, offset) <= radius * radius)
+            & (slots != owners)
+        )
+        return self.order[owners[close]], self.order[slots[close]]
@@ -0,0 +1,531 @@
+import numpy as np
+from enum import Enum, auto
+from spatial import UniformGrid
+
+class Mode(Enum):
+    SEEK = auto()
+    FLEE = auto()
+
+class SeekerState(Enum):
+    RETURNING = auto()
+    FLEEING = auto()
+
+INITIAL_MODIFIERS = {
+    "mass": 1.0,
+    "responsiveness": 1.0,
+    "max_speed": 1.0,
+    "max_force": 1.0,
+    "flee_distance": 150,
+    "calm_buffer": 1.1,
+}
+
+class Modifiers(dict):
+    """Modifier values with a version that bumps on every change,
+    so derived steering values can be cached until it moves
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the dict and its version"""
+
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        """Store value, bumping the version only if it differs"""
+
+        if key in self:
+            current = self[key]
+            if isinstance(current, np.ndarray) or isinstance(
+                value,
+                np.ndarray,
+            ):
+                unchanged = np.array_equal(current, value)
+            else:
+                unchanged = current == value
+            if unchanged:
+                return
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        """Remove key and bump the version"""
+
+        super().__delitem__(key)
+        self.version += 1
+
+    def pop(self, *args):
+        """Pop a key and bump the version"""
+
+        value = super().pop(*args)
+        self.version += 1
+        return value
+
+    def update(self, *args, **kwargs):
+        """Merge values and bump the version"""
+
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def clear(self):
+        """Empty the dict and bump the version"""
+
+        super().clear()
+        self.version += 1
+
+    def copy(self):
+        """Copy into a new versioned dict"""
+
+        return Modifiers(self)
+
+modifiers = Modifiers(INITIAL_MODIFIERS)
+
+SLIDER_LUTS = {
+    "mass": (0.2, 0.4, 0.6, 0.8, 1.0, 1.2, 1.4, 1.6, 1.8, 2.0),
+    "responsiveness": (0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0),
+    "max_speed": (0.2, 0.4, 0.6, 0.8, 1.0, 1.2, 1.4, 1.6, 1.8, 2.0),
+    "max_force": (0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0),
+    "flee_distance": (50, 75, 100, 125, 150, 175, 200, 225, 250, 275),
+    "calm_buffer": (1, 1.1, 1.3, 1.6, 2.0, 2.5),
+}
+
+CENTER_POINT = (400, 400)
+
+# Steps per second that speeds and forces are tuned for. A step of dt
+# reference frames covers dt / REFERENCE_RATE seconds.
+REFERENCE_RATE = 60
+
+# Extra gap, in pixels, that separation keeps between seeker edges
+SEPARATION_PADDING = 4
+
+# Largest gap, in pixels, allowed between where float32 and float64
+# seekers come to rest after the same run. Positions near 800 keep about
+# 6e-5 px of float32 precision; a seeker that falls asleep a step
+# earlier than its float64 twin stops up to 0.1 px short of it, while
+# the 99th percentile stays near 1e-4 px. States and sleep flags must
+# still match exactly once both worlds settle
+FLOAT32_TOLERANCE = 0.25
+
+RETURNING = SeekerState.RETURNING.value
+FLEEING = SeekerState.FLEEING.value
+
+def separation_grid(radii, padding=SEPARATION_PADDING):
+    """Grid sized so any two seekers that can touch share a cell block"""
+
+    return UniformGrid(2 * float(np.max(radii, initial=1)) + padding)
+
+def separation_vectors(positions, radii, grid, padding=SEPARATION_PADDING):
+    """Summed push away from overlapping neighbors, at most unit length.
+    Rebuilds grid from positions, so cost stays near-linear in N
+    """
+
+    positions = np.asarray(positions, dtype=np.float64)
+    radii = np.asarray(radii, dtype=np.float64)
+    push = np.zeros_like(positions)
+    if len(positions) < 2:
+        return push
+    grid.rebuild(positions)
+    i, j = grid.pairs_within(2 * radii.max() + padding)
+    offset = positions[i] - positions[j]
+    distance = np.hypot(offset[:, 0], offset[:, 1])
+    reach = radii[i] + radii[j] + padding
+    close = (distance < reach) & (distance > 0)
+    i = i[close]
+    weight = (1 - distance[close] / reach[close]) / distance[close]
+    count = len(positions)
+    push[:, 0] = np.bincount(i, offset[close, 0] * weight, count)
+    push[:, 1] = np.bincount(i, offset[close, 1] * weight, count)
+    length = np.hypot(push[:, 0], push[:, 1])
+    over = length > 1
+    push[over] /= length[over, None]
+    return push
+
+def flee_transitions(state, distance, flee_distance, calm_distance, rows=None):
+    """Step the flee hysteresis on an integer state array, in place.
+    RETURNING seekers within flee_distance start FLEEING, and FLEEING
+    ones at calm_distance or beyond go back to RETURNING; rows masks
+    which seekers may change. Returns the entering and calming masks
+    """
+
+    entering = (state == RETURNING) & (distance <= flee_distance)
+    if rows is not None:
+        entering &= rows
+    state[entering] = FLEEING
+    calming = (state == FLEEING) & (distance >= calm_distance)
+    if rows is not None:
+        calming &= rows
+    state[calming] = RETURNING
+    return entering, calming
+
+def flee_velocities(displacement, distance, velocity, max_speed):
+    """Desired velocities at max_speed straight away from the threats
+    at displacement, normalized by distance. A seeker on its threat
+    keeps running along its velocity, and a stalled one runs along +x
+    """
+
+    direction = -displacement
+    on_threat = distance == 0
+    direction[on_threat] = velocity[on_threat]
+    length = np.where(
+        on_threat,
+        np.hypot(velocity[:, 0], velocity[:, 1]),
+        distance,
+    )
+    stalled = length == 0
+    direction[stalled] = (1.0, 0.0)
+    length[stalled] = 1.0
+    return direction * (max_speed / length)[:, None]
+
+def threat_displacements(positions, threats, radius, grid, weighted=False):
+    """Per-seeker vector toward what it should flee, and the distance to
+    its nearest threat. Only threats within radius are seen: seekers
+    with none get a zero vector and an infinite distance. weighted sums
+    unit vectors to every visible threat, the closest counting most
+    """
+
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    threats = np.asarray(threats, dtype=np.float64).reshape(-1, 2)
+    count = len(positions)
+    displacement = np.zeros((count, 2))
+    if not len(threats) or not count:
+        return displacement, np.full(count, np.inf)
+    # About one threat per cell keeps nearest lookups to a ring or two;
+    # the floor bounds how many rings a lonely seeker searches
+    width, height = np.ptp(threats, axis=0)
+    grid.cell_size = max(
+        np.sqrt(width * height / len(threats)),
+        radius / 8,
+        1.0,
+    )
+    grid.rebuild(threats)
+    nearest, distance = grid.query_nearest_many(positions, radius)
+    if not weighted:
+        seen = nearest >= 0
+        displacement[seen] = threats[nearest[seen]] - positions[seen]
+        return displacement, distance
+    owners, indices = grid.query_radius_many(positions, radius)
+    offset = threats[indices] - positions[owners]
+    length = np.hypot(offset[:, 0], offset[:, 1])
+    falloff = (1 - length / radius) / np.where(length > 0, length, 1.0)
+    for axis in (0, 1):
+        displacement[:, axis] = np.bincount(
+            owners,
+            offset[:, axis] * falloff,
+            count,
+        )
+    return displacement, distance
+
+class SeekerArrays:
+    """Structure-of-arrays seeker storage with batched steering.
+    Mirrors SeekAndFlee._update_seekers for every agent at once:
+    row i of each array belongs to seeker i
+    """
+
+    def __init__(
+        self,
+        x_pos,
+        y_pos,
+        max_speed,
+        mass,
+        radius,
+        colors=None,
+        dtype=np.float64,
+    ):
+        """Initialize seeker arrays.
+        dtype is the float type every array is stored in: np.float32
+        halves memory and bandwidth, within FLOAT32_TOLERANCE
+        """
+
+        self.pos = np.column_stack((
+            np.asarray(x_pos, dtype=dtype),
+            np.asarray(y_pos, dtype=dtype),
+        ))
+        self.count = len(self.pos)
+        self.velocity = np.zeros_like(self.pos)
+        self.max_speed = np.broadcast_to(
+            np.asarray(max_speed, dtype=dtype),
+            (self.count,),
+        ).copy()
+        self.mass = np.broadcast_to(
+            np.asarray(mass, dtype=dtype),
+            (self.count,),
+        ).copy()
+        self.radius = np.broadcast_to(
+            np.asarray(radius, dtype=dtype),
+            (self.count,),
+        ).copy()
+        self.colors = colors
+        self.state = np.full(self.count, RETURNING, dtype=np.int8)
+        # Seekers that started and stopped fleeing in the last update
+        self.transitions = (0, 0)
+        self._effective_key = None
+        self._effective_values = None
+
+    @classmethod
+    def from_seekers(cls, seekers, dtype=np.float64):
+        """Build arrays from a list of Seeker objects"""
+
+        arrays = cls(
+            x_pos=[seeker.x_pos for seeker in seekers],
+            y_pos=[seeker.y_pos for seeker in seekers],
+            max_speed=[seeker.max_speed for seeker in seekers],
+            mass=[seeker.mass for seeker in seekers],
+            radius=[seeker.radius for seeker in seekers],
+            colors=[seeker.color for seeker in seekers],
+            dtype=dtype,
+        )
+        arrays.velocity[:] = [tuple(seeker.velocity) for seeker in seekers]
+        arrays.state[:] = [seeker.state.value for seeker in seekers]
+        return arrays
+
+    def write_back(self, seekers):
+        """Copy array state onto a matching list of Seeker objects"""
+
+        for seeker, (x, y), (vx, vy), state in zip(
+            seekers,
+            self.pos.tolist(),
+            self.velocity.tolist(),
+            self.state.tolist(),
+        ):
+            seeker.x_pos = x
+            seeker.y_pos = y
+            seeker.velocity.update(vx, vy)
+            seeker.state = SeekerState(state)
+
+    def take(self, rows):
+        """Copy of some rows as a new SeekerArrays; cached effective
+        values come along, so stepping it matches stepping all rows
+        """
+
+        # np.take gathers rows far faster than fancy indexing
+        pos = np.take(self.pos, rows, axis=0)
+        subset = SeekerArrays(
+            x_pos=pos[:, 0],
+            y_pos=pos[:, 1],
+            max_speed=np.take(self.max_speed, rows),
+            mass=np.take(self.mass, rows),
+            radius=np.take(self.radius, rows),
+            dtype=self.pos.dtype,
+        )
+        subset.velocity[:] = np.take(self.velocity, rows, axis=0)
+        subset.state[:] = np.take(self.state, rows)
+        if self._effective_key is not None:
+            subset._effective_key = self._effective_key
+            subset._effective_values = tuple(
+                np.take(values, rows) for values in self._effective_values
+            )
+            for values in subset._effective_values:
+                values.setflags(write=False)
+        return subset
+
+    def put(self, rows, subset):
+        """Copy motion and state back from a take(rows) subset"""
+
+        self.pos[rows] = subset.pos
+        self.velocity[rows] = subset.velocity
+        self.state[rows] = subset.state
+
+    def effective_values(self, mods):
+        """Batched equivalent of _recalculate_effective_values.
+        Cached until a versioned mods changes or invalidate() is called
+        """
+
+        version = getattr(mods, "version", None)
+        key = (id(mods), version)
+        if version is not None and key == self._effective_key:
+            return self._effective_values
+        values = self._compute_effective_values(mods)
+        for array in values:
+            array.setflags(write=False)
+        if version is not None:
+            self._effective_key = key
+            self._effective_values = values
+        return values
+
+    def invalidate(self):
+        """Drop cached effective values after editing max_speed or mass"""
+
+        self._effective_key = None
+        self._effective_values = None
+
+    def _compute_effective_values(self, mods):
+        """Derive max speed, max force and slowing distance per seeker"""
+
+        effective_max_speed = self.max_speed * mods["max_speed"]
+        effective_mass = self.mass * mods["mass"]
+        response_time = effective_mass / mods["responsiveness"]
+        effective_max_force = (
+            (effective_max_speed / response_time)
+            * mods["max_force"]
+        )
+        slowing_distance = (
+            (effective_max_speed ** 2)
+            / (effective_max_force * 2)
+        )
+        return (effective_max_speed, effective_max_force, slowing_distance)
+
+    def update(
+        self,
+        mode,
+        target,
+        mods=modifiers,
+        dt=1.0,
+        separation=0.0,
+        grid=None,
+        threats=None,
+        weighted_threats=False,
+        threat_grid=None,
+        flow_field=None,
+    ):
+        """Advance every seeker one step toward or away from target.
+        mode is a Mode, or a boolean array that is True for seekers in
+        FLEE mode; target is one point or one per seeker, and dt one
+        step length or one per seeker.
+        separation > 0 blends in a push away from overlapping seekers;
+        in FLEE mode, an (M, 2) array of threats replaces target, and a
+        FlowField steers RETURNING seekers instead of CENTER_POINT
+        """
+
+        (
+            effective_max_speed,
+            effective_max_force,
+            slowing_distance,
+        ) = self.effective_values(mods)
+        self.transitions = (0, 0)
+        # Points, and below threat, separation and flow field results,
+        # in the storage type, so float32 math stays float32
+        dtype = self.pos.dtype
+        displacement = np.subtract(np.asarray(target, dtype), self.pos)
+        distance = np.hypot(displacement[:, 0], displacement[:, 1])
+        flee_rows = None
+        if not isinstance(mode, Mode):
+            flee_rows = np.asarray(mode, dtype=bool)
+            mode = Mode.FLEE if flee_rows.any() else Mode.SEEK
+            if mode == Mode.SEEK or flee_rows.all():
+                flee_rows = None
+        if flee_rows is not None:
+            # Mixed modes: seekers outside flee_rows seek as usual
+            seeking = ~flee_rows
+            seek_velocity = self._arrive(
+                displacement[seeking],
+                distance[seeking],
+                effective_max_speed[seeking],
+                slowing_distance[seeking],
+            )
+        if mode == Mode.SEEK:
+            desired_velocity = self._arrive(
+                displacement,
+                distance,
+                effective_max_speed,
+                slowing_distance,
+            )
+        else:
+            flee_distance = mods["flee_distance"]
+            calm_distance = flee_distance * mods["calm_buffer"]
+            if threats is not None:
+                if threat_grid is None:
+                    threat_grid = UniformGrid(1.0)
+                displacement, distance = threat_displacements(
+                    self.pos,
+                    threats,
+                    np.max(np.maximum(calm_distance, flee_distance)),
+                    threat_grid,
+                    weighted_threats,
+                )
+                # The grid works in float64; bring the results back to
+                # storage so they don't promote the rest of the step
+                displacement = displacement.astype(dtype, copy=False)
+                distance = distance.astype(dtype, copy=False)
+            entering, calming = flee_transitions(
+                self.state,
+                distance,
+                flee_distance,
+                calm_distance,
+                flee_rows,
+            )
+            self.transitions = (
+                int(np.count_nonzero(entering)),
+                int(np.count_nonzero(calming)),
+            )
+            fleeing = self.state == FLEEING
+            if flee_rows is not None:
+                fleeing &= flee_rows
+            if flow_field is None:
+                home_displacement = np.subtract(
+                    np.asarray(CENTER_POINT, dtype),
+                    self.pos,
+                )
+                desired_velocity = self._arrive(
+                    home_displacement,
+                    np.hypot(
+                        home_displacement[:, 0],
+                        home_displacement[:, 1],
+                    ),
+                    effective_max_speed,
+                    slowing_distance,
+                )
+            else:
+                desired_velocity = flow_field.desired_velocities(
+                    self.pos,
+                    effective_max_speed,
+                    slowing_distance,
+                )
+            if fleeing.any():
+                away = displacement[fleeing]
+                desired_velocity[fleeing] = flee_velocities(
+                    away,
+                    np.hypot(away[:, 0], away[:, 1])
+                    if threats is not None else distance[fleeing],
+                    self.velocity[fleeing],
+                    effective_max_speed[fleeing],
+                )
+            if flee_rows is not None:
+                desired_velocity[seeking] = seek_velocity
+        if separation:
+            if grid is None:
+                grid = separation_grid(self.radius)
+            push = separation_vectors(
+                self.pos,
+                self.radius,
+                grid,
+            ).astype(dtype, copy=False)
+            desired_velocity += push * (
+                separation * effective_max_speed
+            )[:, None]
+        self.apply_steering(
+            desired_velocity,
+            effective_max_force,
+            effective_max_speed,
+            dt,
+        )
+
+    def _arrive(self, displacement, distance, max_speed, slowing_distance):
+        """Desired velocities with the arrival ramp, zero inside 1px"""
+
+        moving = distance >= 1
+        safe_distance = np.where(moving, distance, 1.0)
+        clipped_speed = np.minimum(
+            max_speed * (distance / slowing_distance),
+            max_speed,
+        )
+        scale = np.where(moving, clipped_speed / safe_distance, 0.0)
+        return displacement * scale[:, None]
+
+    def apply_steering(self, desired_velocity, max_force, max_speed, dt=1.0):
+        """Batched equivalent of _apply_steering; dt may be one per row"""
+
+        steering_force = desired_velocity - self.velocity
+        self._clamp_length(steering_force, max_force * dt)
+        self.velocity += steering_force
+        self._clamp_length(self.velocity, max_speed)
+        if np.ndim(dt):
+            dt = dt[:, None]
+        self.pos += self.velocity * dt
+
+    @staticmethod
+    def _clamp_length(vectors, limit):
+        """Scale rows longer than limit down to limit, in place"""
+
+        length = np.hypot(vectors[:, 0], vectors[:, 1])
+        over = length > limit
+        if over.any():
+            vectors[over] *= (limit[over] / length[over])[:, None]
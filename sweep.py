@@ -0,0 +1,202 @@
+import csv
+import sys
+import time
+import random
+import argparse
+import itertools
+import multiprocessing
+import numpy as np
+from steering import (
+    Mode,
+    SLIDER_LUTS,
+    CENTER_POINT,
+    Modifiers,
+    SeekerArrays,
+)
+from world import DEFAULT_SEEKERS
+
+SWEEP_PARAMETERS = (
+    "mass",
+    "responsiveness",
+    "max_speed",
+    "max_force",
+    "flee_distance",
+    "calm_buffer",
+)
+
+SEEK_TARGET = (600, 200)
+SEEK_STEPS = 900
+FLEE_STEPS = 900
+# Threat circles CENTER_POINT at this radius and angular speed (rad/step)
+ORBIT_RADIUS = 120
+ORBIT_SPEED = 0.03
+# A seeker counts as settled inside this radius, below this speed
+SETTLE_RADIUS = 2.0
+SETTLE_SPEED = 0.1
+
+METRICS = (
+    "settle_steps",
+    "overshoot",
+    "peak_speed",
+    "state_flips",
+)
+
+def all_combinations():
+    """Every combination of SLIDER_LUTS values, in SWEEP_PARAMETERS order"""
+
+    return itertools.product(
+        *(SLIDER_LUTS[name] for name in SWEEP_PARAMETERS)
+    )
+
+def sample_combinations(count, seed=None):
+    """count distinct combinations drawn uniformly from the full grid"""
+
+    sizes = [len(SLIDER_LUTS[name]) for name in SWEEP_PARAMETERS]
+    total = int(np.prod(sizes))
+    picks = random.Random(seed).sample(range(total), min(count, total))
+    combinations = []
+    for flat in sorted(picks):
+        combination = []
+        for name, size in zip(
+            reversed(SWEEP_PARAMETERS),
+            reversed(sizes),
+        ):
+            flat, index = divmod(flat, size)
+            combination.append(SLIDER_LUTS[name][index])
+        combinations.append(tuple(reversed(combination)))
+    return combinations
+
+def run_chunk(combinations):
+    """Run the seek/flee scenario for a chunk of combinations at once.
+    Each combination gets its own copy of the default seekers; the
+    modifiers are per-seeker arrays so one SeekerArrays steps them all
+    """
+
+    combinations = np.asarray(combinations, dtype=np.float64)
+    per_run = len(DEFAULT_SEEKERS)
+    runs = len(combinations)
+    arrays = SeekerArrays(
+        x_pos=np.tile([seeker["x_pos"] for seeker in DEFAULT_SEEKERS], runs),
+        y_pos=np.tile([seeker["y_pos"] for seeker in DEFAULT_SEEKERS], runs),
+        max_speed=np.tile(
+            [seeker["max_speed"] for seeker in DEFAULT_SEEKERS],
+            runs,
+        ),
+        mass=np.tile([seeker["mass"] for seeker in DEFAULT_SEEKERS], runs),
+        radius=np.tile(
+            [seeker["radius"] for seeker in DEFAULT_SEEKERS],
+            runs,
+        ),
+    )
+    mods = Modifiers({
+        name: np.repeat(combinations[:, column], per_run)
+        for column, name in enumerate(SWEEP_PARAMETERS)
+    })
+
+    approach = np.subtract(SEEK_TARGET, arrays.pos)
+    approach /= np.hypot(approach[:, 0], approach[:, 1])[:, None]
+    settle_steps = np.zeros(arrays.count)
+    overshoot = np.zeros(arrays.count)
+    peak_speed = np.zeros(arrays.count)
+    for step in range(SEEK_STEPS):
+        arrays.update(Mode.SEEK, SEEK_TARGET, mods)
+        offset = arrays.pos - SEEK_TARGET
+        speed = np.hypot(arrays.velocity[:, 0], arrays.velocity[:, 1])
+        np.maximum(peak_speed, speed, out=peak_speed)
+        np.maximum(
+            overshoot,
+            np.einsum("ij,ij->i", offset, approach),
+            out=overshoot,
+        )
+        settled = (
+            (np.hypot(offset[:, 0], offset[:, 1]) < SETTLE_RADIUS)
+            & (speed < SETTLE_SPEED)
+        )
+        settle_steps[~settled] = step + 1
+    settle_steps[settle_steps == SEEK_STEPS] = np.nan
+
+    state_flips = np.zeros(arrays.count, dtype=np.int64)
+    previous_state = arrays.state.copy()
+    for step in range(FLEE_STEPS):
+        angle = step * ORBIT_SPEED
+        threat = (
+            CENTER_POINT[0] + ORBIT_RADIUS * np.cos(angle),
+            CENTER_POINT[1] + ORBIT_RADIUS * np.sin(angle),
+        )
+        arrays.update(Mode.FLEE, threat, mods)
+        np.maximum(
+            peak_speed,
+            np.hypot(arrays.velocity[:, 0], arrays.velocity[:, 1]),
+            out=peak_speed,
+        )
+        state_flips += arrays.state != previous_state
+        previous_state[:] = arrays.state
+
+    by_run = (runs, per_run)
+    return [
+        tuple(combination) + metrics
+        for combination, metrics in zip(
+            combinations.tolist(),
+            zip(
+                settle_steps.reshape(by_run).max(axis=1).tolist(),
+                overshoot.reshape(by_run).max(axis=1).tolist(),
+                peak_speed.reshape(by_run).max(axis=1).tolist(),
+                state_flips.reshape(by_run).sum(axis=1).tolist(),
+            ),
+        )
+    ]
+
+def _chunks(combinations, chunk_size):
+    """Split an iterable of combinations into lists of chunk_size"""
+
+    iterator = iter(combinations)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def sweep(combinations, processes=None, chunk_size=2000):
+    """Yield result rows for every combination across a process pool.
+    Rows are parameter values then METRICS, in completion order
+    """
+
+    with multiprocessing.Pool(processes) as pool:
+        for rows in pool.imap_unordered(
+            run_chunk,
+            _chunks(combinations, chunk_size),
+        ):
+            yield from rows
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Sweep SLIDER_LUTS combinations headlessly",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        help="run this many random combinations instead of the full grid",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+    if args.sample is None:
+        combinations = all_combinations()
+    else:
+        combinations = sample_combinations(args.sample, args.seed)
+    start = time.perf_counter()
+    count = 0
+    with open(args.output, "w", newline="") as output:
+        writer = csv.writer(output)
+        writer.writerow(SWEEP_PARAMETERS + METRICS)
+        for row in sweep(combinations, args.processes, args.chunk_size):
+            writer.writerow(row)
+            count += 1
+    print(
+        f"{count} runs in {time.perf_counter() - start:.1f}s "
+        f"-> {args.output}",
+        file=sys.stderr,
+    )
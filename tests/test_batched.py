@@ -0,0 +1,31 @@
+import numpy as np
+
+from batched import BatchedWorld, OBSERVATION_FIELDS
+
+def test_reset_returns_observations_and_infos():
+    batch = BatchedWorld(3, spawn_bounds=(800, 800), seed=0)
+    observations, infos = batch.reset()
+    assert observations.shape == (3, batch.per_world, len(OBSERVATION_FIELDS))
+    assert infos == {}
+    again, _ = batch.reset(seed=0)
+    np.testing.assert_array_equal(observations, again)
+
+def test_final_observation_has_one_entry_per_world():
+    batch = BatchedWorld(3, max_steps=3, spawn_bounds=(800, 800), seed=0)
+    batch.reset()
+    batch.steps[1] = 2
+    actions = np.zeros((3, 2))
+    _, _, _, truncated, infos = batch.step(actions)
+    np.testing.assert_array_equal(truncated, (False, True, False))
+    final = infos["final_observation"]
+    assert final.dtype == object and final.shape == (3,)
+    assert final[0] is None and final[2] is None
+    assert final[1].shape == (batch.per_world, len(OBSERVATION_FIELDS))
+    np.testing.assert_array_equal(
+        infos["_final_observation"],
+        (False, True, False),
+    )
+    assert batch.steps[1] == 0
+    _, _, _, truncated, infos = batch.step(actions)
+    assert not truncated.any()
+    assert infos == {}
@@ -0,0 +1,77 @@
+import random
+import numpy as np
+import pytest
+
+import steering
+from steering import FLOAT32_TOLERANCE, Mode, Modifiers, INITIAL_MODIFIERS
+from world import SteeringWorld, check_float32, default_seekers
+from replay import InputRecorder, replay
+
+def test_float32_converges_like_float64():
+    rows = {
+        name: (states_match, gap)
+        for name, states_match, gap, _ in check_float32(population=500)
+    }
+    assert set(rows) == {"seek arrival", "flee hysteresis"}
+    for states_match, gap in rows.values():
+        assert states_match
+        assert gap <= FLOAT32_TOLERANCE
+
+def test_float32_recording_replays_bit_identical(tmp_path):
+    random.seed(0)
+    world = SteeringWorld(
+        default_seekers(population=200),
+        engine="vectorized",
+        mods=Modifiers(INITIAL_MODIFIERS),
+        dtype=np.float32,
+    )
+    path = str(tmp_path / "session.sfrl")
+    world.recorder = InputRecorder(path, world)
+    for index in range(120):
+        world.mode = Mode.SEEK if index < 60 else Mode.FLEE
+        world.set_target((300 + index, 400))
+        world.step()
+    world.recorder.close(world)
+    replayed, digest = replay(path)
+    assert replayed.seeker_arrays.pos.dtype == np.float32
+    assert replayed.state_digest() == digest
+
+@pytest.mark.parametrize("feature", ("threats", "separation", "homes"))
+def test_float32_steps_stay_float32(feature, monkeypatch):
+    seen = []
+    flee_velocities = steering.flee_velocities
+    apply_steering = steering.SeekerArrays.apply_steering
+
+    def record_flee(displacement, distance, velocity, max_speed):
+        seen.extend((displacement.dtype, distance.dtype))
+        return flee_velocities(displacement, distance, velocity, max_speed)
+
+    def record_steering(self, desired_velocity, *args, **kwargs):
+        seen.append(desired_velocity.dtype)
+        return apply_steering(self, desired_velocity, *args, **kwargs)
+
+    monkeypatch.setattr(steering, "flee_velocities", record_flee)
+    monkeypatch.setattr(
+        steering.SeekerArrays,
+        "apply_steering",
+        record_steering,
+    )
+    random.seed(0)
+    world = SteeringWorld(
+        default_seekers(population=300),
+        engine="vectorized",
+        mods=Modifiers(INITIAL_MODIFIERS),
+        separation=1.0 if feature == "separation" else 0.0,
+        dtype=np.float32,
+    )
+    world.mode = Mode.FLEE
+    world.set_target((400, 400))
+    if feature == "threats":
+        world.set_threats([(200, 200), (600, 500)], weighted=True)
+    elif feature == "homes":
+        world.set_homes([(150, 150), (650, 650)], [(400, 400, 80)])
+    world.step(30)
+    arrays = world.seeker_arrays
+    assert arrays.pos.dtype == np.float32
+    assert arrays.velocity.dtype == np.float32
+    assert seen and set(seen) == {np.dtype(np.float32)}
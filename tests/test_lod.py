@@ -0,0 +1,40 @@
+import math
+import random
+import numpy as np
+import pytest
+
+from world import SteeringWorld, default_seekers
+
+class TimedWorld(SteeringWorld):
+    """SteeringWorld that adds up the dt each seeker is stepped by"""
+
+    def _step_rows(self, mode, rows, dt):
+        np.add.at(self.simulated, slice(None) if rows is None else rows, dt)
+        return super()._step_rows(mode, rows, dt)
+
+    def _step_scalar(self, mode, rows, dt):
+        np.add.at(self.simulated, rows, dt)
+        return super()._step_scalar(mode, rows, dt)
+
+@pytest.mark.parametrize("engine", ("scalar", "vectorized"))
+def test_lod_simulated_time_matches_frames(engine):
+    random.seed(0)
+    world = TimedWorld(
+        default_seekers(population=2000, bounds=(6000, 6000)),
+        engine=engine,
+        sleep=False,
+    )
+    world.simulated = np.zeros(len(world.seekers))
+    world.set_lod()
+    # A target circling the world keeps seekers changing bands
+    for index in range(400):
+        angle = index / 40
+        world.set_target((
+            3000 + 2500 * math.cos(angle),
+            3000 + 2500 * math.sin(angle),
+        ))
+        world.step()
+    # Turning LOD off catches every waiting seeker up
+    world.set_lod(None)
+    world.step()
+    assert np.array_equal(world.simulated, np.full(2000, 401.0))
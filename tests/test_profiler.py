@@ -0,0 +1,27 @@
+import csv
+
+from profiler import FrameProfiler, FrameSink
+
+def test_csv_keeps_phases_that_first_appear_late(tmp_path):
+    path = str(tmp_path / "frames.csv")
+    profiler = FrameProfiler(sink=FrameSink(path))
+    for frame in range(3):
+        profiler.begin_frame()
+        with profiler.section("update"):
+            pass
+        if frame == 2:
+            with profiler.section("overlay"):
+                pass
+        profiler.end_frame()
+    profiler.close()
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["frame"], row["phase"]) for row in rows] == [
+        ("0", "update"),
+        ("0", "total"),
+        ("1", "update"),
+        ("1", "total"),
+        ("2", "update"),
+        ("2", "overlay"),
+        ("2", "total"),
+    ]
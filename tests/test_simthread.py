@@ -0,0 +1,45 @@
+import random
+import numpy as np
+
+from world import SteeringWorld, default_seekers
+from simthread import SimulationThread
+
+def test_publish_reuses_two_snapshots():
+    random.seed(0)
+    world = SteeringWorld(default_seekers(population=50), engine="vectorized")
+    simulation = SimulationThread(world)
+    snapshots = {id(simulation.snapshot), id(simulation.idle)}
+    arrays = {id(simulation.snapshot.pos), id(simulation.idle.pos)}
+    for _ in range(5):
+        previous = simulation.snapshot.pos.copy()
+        world.step()
+        simulation._publish()
+        snapshot = simulation.snapshot
+        assert {id(snapshot), id(simulation.idle)} == snapshots
+        assert {id(snapshot.pos), id(simulation.idle.pos)} == arrays
+        assert snapshot.frame == world.frame
+        np.testing.assert_array_equal(snapshot.previous_pos, previous)
+        np.testing.assert_array_equal(
+            snapshot.pos,
+            world.render_positions(as_array=True),
+        )
+
+def test_latest_copies_out_of_the_snapshot():
+    random.seed(0)
+    world = SteeringWorld(default_seekers(population=50), engine="vectorized")
+    simulation = SimulationThread(world)
+    positions, asleep = simulation.latest(alpha=1)
+    world.step()
+    simulation._publish()
+    simulation._publish()
+    assert not np.shares_memory(positions, simulation.snapshot.pos)
+    assert not np.shares_memory(asleep, simulation.snapshot.asleep)
+
+def test_thread_steps_and_stops():
+    random.seed(0)
+    world = SteeringWorld(default_seekers(population=50), engine="vectorized")
+    simulation = SimulationThread(world, max_substeps=2).start()
+    simulation.stopping.wait(0.1)
+    simulation.stop()
+    assert simulation.steps > 0
+    assert simulation.snapshot.frame == world.frame
@@ -0,0 +1,75 @@
+import os
+import sys
+import random
+import subprocess
+import pytest
+
+from steering import Mode, Modifiers, INITIAL_MODIFIERS
+from world import SteeringWorld, default_seekers
+from tiled import TiledWorld
+
+@pytest.mark.parametrize("threats", (False, True))
+def test_tiled_matches_vectorized_without_separation(threats):
+    worlds = []
+    for make in (SteeringWorld, TiledWorld):
+        random.seed(0)
+        seekers = default_seekers(population=2000)
+        if make is TiledWorld:
+            world = TiledWorld(
+                seekers,
+                workers=2,
+                mods=Modifiers(INITIAL_MODIFIERS),
+            )
+        else:
+            world = SteeringWorld(
+                seekers,
+                engine="vectorized",
+                mods=Modifiers(INITIAL_MODIFIERS),
+                sleep=False,
+            )
+        if threats:
+            world.set_threats([(200, 200), (600, 500), (400, 700)])
+        worlds.append(world)
+    vectorized, tiled = worlds
+    try:
+        # Enough steps for seekers to cross strip edges and rebalance
+        for index in range(120):
+            for world in worlds:
+                world.mode = Mode.SEEK if index < 60 else Mode.FLEE
+                world.set_target((300 + 2 * index, 400))
+                world.step()
+        assert tiled.state_digest() == vectorized.state_digest()
+    finally:
+        tiled.close()
+
+def test_process_exits_after_an_exception_with_tiled_workers():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = (
+        "from seek_and_flee import SeekAndFlee\n"
+        "SeekAndFlee(engine='tiled', workers=2, population=100)\n"
+        "raise RuntimeError('boom')\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=root,
+        env=dict(os.environ, SDL_VIDEODRIVER="dummy"),
+        capture_output=True,
+        timeout=30,
+    )
+    assert result.returncode == 1
+    assert b"RuntimeError: boom" in result.stderr
+
+def test_run_game_stops_tiled_workers_on_an_exception():
+    from seek_and_flee import SeekAndFlee
+
+    game = SeekAndFlee(engine="tiled", workers=2, population=100)
+    workers = list(game.world.workers)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    game._check_events = fail
+    with pytest.raises(RuntimeError):
+        game.run_game()
+    assert game.world.workers == []
+    assert not any(worker.is_alive() for worker in workers)
@@ -0,0 +1,32 @@
+import random
+import threading
+
+from world import SteeringWorld, default_seekers
+from trajectory import TrajectorySink
+
+def test_writer_failure_reaches_the_producer(tmp_path):
+    random.seed(0)
+    world = SteeringWorld(default_seekers(population=10), engine="vectorized")
+    sink = TrajectorySink(str(tmp_path), 10, chunk_steps=1, buffers=2)
+
+    def fail(buffer, rows):
+        raise ValueError("bad chunk")
+
+    sink._write_chunk = fail
+    raised = []
+
+    def produce():
+        try:
+            # More hand-offs than buffers: a lost buffer would block here
+            for _ in range(10):
+                world.step()
+                sink.capture(world)
+            sink.close()
+        except ValueError as error:
+            raised.append(error)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    producer.join(timeout=10)
+    assert not producer.is_alive()
+    assert len(raised) == 1 and str(raised[0]) == "bad chunk"
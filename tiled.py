@@ -0,0 +1,405 @@
+import os
+import signal
+import hashlib
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from steering import (
+    Mode,
+    CENTER_POINT,
+    INITIAL_MODIFIERS,
+    REFERENCE_RATE,
+    SEPARATION_PADDING,
+    SeekerArrays,
+    modifiers,
+    separation_grid,
+)
+from spatial import UniformGrid
+
+MODIFIER_NAMES = tuple(INITIAL_MODIFIERS)
+# Steps between moving tile edges to even out the seekers per tile
+REBALANCE_STEPS = 30
+
+# Slots of the shared control array the main process fills every step
+(
+    _BUFFER,
+    _STOP,
+    _MODE,
+    _TARGET_X,
+    _TARGET_Y,
+    _DT,
+    _SEPARATION,
+    _HALO,
+    _THREATS,
+    _WEIGHTED,
+    _MODIFIERS,
+) = range(11)
+_CONTROL_SIZE = _MODIFIERS + len(MODIFIER_NAMES)
+
+def _layout(count, tiles, max_threats):
+    """Shape and dtype of every shared array.
+    Per-seeker state is double-buffered: a step reads buffer b, halos
+    included, and writes 1 - b, so no worker sees another's half-done
+    step
+    """
+
+    return {
+        "pos": ((2, count, 2), np.float64),
+        "velocity": ((2, count, 2), np.float64),
+        "state": ((2, count), np.int8),
+        "owner": ((2, count), np.int32),
+        "max_speed": ((count,), np.float64),
+        "mass": ((count,), np.float64),
+        "radius": ((count,), np.float64),
+        "edges": ((tiles + 1,), np.float64),
+        "threats": ((max_threats, 2), np.float64),
+        "control": ((_CONTROL_SIZE,), np.float64),
+    }
+
+class SharedArrays:
+    """numpy arrays backed by multiprocessing.shared_memory blocks.
+    Created fresh without names, or attached to existing blocks by name
+    """
+
+    def __init__(self, layout, names=None):
+        """Create or attach one block per layout entry"""
+
+        self.blocks = {}
+        self.arrays = {}
+        for key, (shape, dtype) in layout.items():
+            if names is None:
+                size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                block = shared_memory.SharedMemory(
+                    create=True,
+                    size=max(size, 1),
+                )
+            else:
+                block = shared_memory.SharedMemory(name=names[key])
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype, buffer=block.buf)
+
+    @property
+    def names(self):
+        """Block names to attach to from another process"""
+
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def close(self, unlink=False):
+        """Drop the arrays and detach; unlink frees the memory for good"""
+
+        self.arrays = {}
+        for block in self.blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                # A caller still holds a view; it keeps the mapping alive
+                pass
+            if unlink:
+                block.unlink()
+        self.blocks = {}
+
+def _tile_of(edges, x):
+    """Tile owning each x, given the tiles' edges"""
+
+    return np.searchsorted(edges[1:-1], x, side="right").astype(np.int32)
+
+def _step_tile(tile, shared, grid, threat_grid):
+    """Step the seekers one tile owns, reading halo neighbors from the
+    current buffer and writing owned rows to the other
+    """
+
+    control = shared["control"]
+    source = int(control[_BUFFER])
+    target = 1 - source
+    pos = shared["pos"][source]
+    owner = shared["owner"][source]
+    edges = shared["edges"]
+    mine = np.flatnonzero(owner == tile)
+    if not len(mine):
+        return
+    left, right = edges[tile], edges[tile + 1]
+    halo = control[_HALO]
+    rows = mine
+    if halo > 0:
+        x = pos[:, 0]
+        ghosts = np.flatnonzero(
+            (owner != tile) & (x >= left - halo) & (x < right + halo)
+        )
+        rows = np.concatenate((mine, ghosts))
+    arrays = SeekerArrays(
+        x_pos=pos[rows, 0],
+        y_pos=pos[rows, 1],
+        max_speed=shared["max_speed"][rows],
+        mass=shared["mass"][rows],
+        radius=shared["radius"][rows],
+    )
+    arrays.velocity[:] = shared["velocity"][source][rows]
+    arrays.state[:] = shared["state"][source][rows]
+    mods = {
+        name: control[_MODIFIERS + index]
+        for index, name in enumerate(MODIFIER_NAMES)
+    }
+    threats = None
+    threat_count = int(control[_THREATS])
+    if threat_count >= 0:
+        # Only threats a seeker in the tile could react to
+        threats = shared["threats"][:threat_count]
+        reach = max(
+            mods["flee_distance"],
+            mods["flee_distance"] * mods["calm_buffer"],
+        )
+        low = min(left, arrays.pos[:, 0].min()) - reach
+        high = max(right, arrays.pos[:, 0].max()) + reach
+        threats = threats[(threats[:, 0] >= low) & (threats[:, 0] <= high)]
+    arrays.update(
+        Mode(int(control[_MODE])),
+        (control[_TARGET_X], control[_TARGET_Y]),
+        mods,
+        control[_DT],
+        control[_SEPARATION],
+        grid,
+        threats,
+        bool(control[_WEIGHTED]),
+        threat_grid,
+    )
+    owned = len(mine)
+    shared["pos"][target][mine] = arrays.pos[:owned]
+    shared["velocity"][target][mine] = arrays.velocity[:owned]
+    shared["state"][target][mine] = arrays.state[:owned]
+    # Seekers that crossed an edge now belong to the neighbor tile
+    shared["owner"][target][mine] = _tile_of(edges, arrays.pos[:owned, 0])
+
+def _tile_worker(tile, names, layout, start, done):
+    """Worker process: step one tile each time the barriers open"""
+
+    # A fork copies the parent's handlers, and SDL's would swallow the
+    # SIGTERM that terminate() and multiprocessing's exit cleanup send
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    shared_arrays = SharedArrays(layout, names)
+    shared = shared_arrays.arrays
+    grid = separation_grid(shared["radius"])
+    threat_grid = UniformGrid(1.0)
+    try:
+        while True:
+            start.wait()
+            if shared["control"][_STOP]:
+                break
+            _step_tile(tile, shared, grid, threat_grid)
+            done.wait()
+    except threading.BrokenBarrierError:
+        pass
+    except Exception:
+        start.abort()
+        done.abort()
+        raise
+    finally:
+        shared = None
+        shared_arrays.close()
+
+class TiledWorld:
+    """Seekers split into vertical tiles, each stepped by its own worker
+    process. Every per-seeker array lives in shared memory, so nothing
+    is pickled per step: seekers migrate by changing owner, halos are
+    read straight from the shared positions, and drawing reads the
+    current buffer without a copy. Per seeker, a step is exactly
+    SeekerArrays.update, so without separation results are
+    bit-identical to the vectorized engine. With it, neighbor pushes
+    are summed in a different order, so the two behave alike but drift
+    apart
+    """
+
+    engine = "tiled"
+
+    def __init__(
+        self,
+        seekers,
+        workers=None,
+        mods=modifiers,
+        physics_rate=REFERENCE_RATE,
+        separation=0.0,
+        max_threats=4096,
+    ):
+        """Start workers (default one per CPU) over the seekers.
+        max_threats caps how many threats set_threats() accepts
+        """
+
+        self.seekers = seekers
+        self.count = len(seekers)
+        self.tiles = workers or os.cpu_count() or 1
+        self.modifiers = mods
+        self.mode = Mode.SEEK
+        self.target = CENTER_POINT
+        self.frame = 0
+        self.dt = REFERENCE_RATE / physics_rate
+        self.separation = separation
+        self.threats = None
+        self.weighted_threats = False
+        self.asleep = np.zeros(self.count, dtype=bool)
+        self.recorder = None
+        self.trajectory = None
+        layout = _layout(self.count, self.tiles, max_threats)
+        self.shared_arrays = SharedArrays(layout)
+        shared = self.shared_arrays.arrays
+        self.shared = shared
+        initial = SeekerArrays.from_seekers(seekers)
+        shared["pos"][0] = initial.pos
+        shared["velocity"][0] = initial.velocity
+        shared["state"][0] = initial.state
+        shared["max_speed"][:] = initial.max_speed
+        shared["mass"][:] = initial.mass
+        shared["radius"][:] = initial.radius
+        shared["control"][:] = 0
+        shared["control"][_THREATS] = -1
+        self._rebalance()
+        context = multiprocessing.get_context()
+        self.start = context.Barrier(self.tiles + 1)
+        self.done = context.Barrier(self.tiles + 1)
+        self.workers = [
+            context.Process(
+                target=_tile_worker,
+                args=(
+                    tile,
+                    self.shared_arrays.names,
+                    layout,
+                    self.start,
+                    self.done,
+                ),
+                daemon=True,
+            )
+            for tile in range(self.tiles)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    @property
+    def buffer(self):
+        """Index of the buffer holding the current state"""
+
+        return int(self.shared["control"][_BUFFER])
+
+    def set_target(self, target):
+        """Move the point that seekers seek or flee"""
+
+        self.target = target
+
+    def set_threats(self, threats, weighted=False):
+        """Like SteeringWorld.set_threats, up to max_threats points"""
+
+        if threats is not None:
+            threats = np.asarray(threats, dtype=np.float64).reshape(-1, 2)
+            capacity = len(self.shared["threats"])
+            if len(threats) > capacity:
+                raise ValueError(
+                    f"{len(threats)} threats, room for {capacity}"
+                )
+            self.shared["threats"][:len(threats)] = threats
+        self.threats = threats
+        self.weighted_threats = weighted
+
+    def step(self, n=1):
+        """Advance every tile n steps"""
+
+        control = self.shared["control"]
+        for _ in range(n):
+            control[_MODE] = self.mode.value
+            control[_TARGET_X], control[_TARGET_Y] = self.target
+            control[_DT] = self.dt
+            control[_SEPARATION] = self.separation
+            # Neighbors that can touch a tile's seekers sit this close
+            control[_HALO] = (
+                2 * self.shared["radius"].max(initial=0.0)
+                + SEPARATION_PADDING
+                if self.separation else 0.0
+            )
+            control[_THREATS] = (
+                -1 if self.threats is None else len(self.threats)
+            )
+            control[_WEIGHTED] = self.weighted_threats
+            for index, name in enumerate(MODIFIER_NAMES):
+                control[_MODIFIERS + index] = self.modifiers[name]
+            try:
+                self.start.wait()
+                self.done.wait()
+            except threading.BrokenBarrierError:
+                raise RuntimeError("a tile worker failed") from None
+            control[_BUFFER] = 1 - self.buffer
+            self.frame += 1
+            if self.frame % REBALANCE_STEPS == 0:
+                self._rebalance()
+
+    def _rebalance(self):
+        """Move tile edges to the seekers' x quantiles, so tiles hold
+        about the same number of seekers, and reassign owners
+        """
+
+        edges = self.shared["edges"]
+        x = self.shared["pos"][self.buffer][:, 0]
+        edges[0] = -np.inf
+        edges[-1] = np.inf
+        if self.count:
+            edges[1:-1] = np.quantile(
+                x,
+                np.arange(1, self.tiles) / self.tiles,
+            )
+        self.shared["owner"][self.buffer] = _tile_of(edges, x)
+
+    def store_previous(self):
+        """Nothing to copy: the other buffer already holds the last state"""
+
+    def render_positions(self, alpha=1.0, as_array=False):
+        """Positions blended between the last two steps; at alpha 1,
+        as_array returns the shared buffer itself, read-only
+        """
+
+        pos = self.shared["pos"][self.buffer]
+        if alpha < 1 and self.frame:
+            previous = self.shared["pos"][1 - self.buffer]
+            pos = previous + (pos - previous) * alpha
+        else:
+            pos = pos.view()
+            pos.setflags(write=False)
+        return pos if as_array else pos.tolist()
+
+    def sync_seekers(self):
+        """Copy shared state back onto the Seeker objects"""
+
+        buffer = self.buffer
+        arrays = SeekerArrays.from_seekers(self.seekers)
+        arrays.pos[:] = self.shared["pos"][buffer]
+        arrays.velocity[:] = self.shared["velocity"][buffer]
+        arrays.state[:] = self.shared["state"][buffer]
+        arrays.write_back(self.seekers)
+
+    def state_digest(self):
+        """SHA-256 of every seeker's position, velocity and state,
+        comparable with SteeringWorld.state_digest
+        """
+
+        buffer = self.buffer
+        motion = np.column_stack((
+            self.shared["pos"][buffer],
+            self.shared["velocity"][buffer],
+        ))
+        digest = hashlib.sha256(np.ascontiguousarray(motion).tobytes())
+        digest.update(self.shared["state"][buffer].tobytes())
+        return digest.digest()
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+
+        if not self.workers:
+            return
+        self.shared["control"][_STOP] = 1
+        try:
+            self.start.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+        self.shared = None
+        self.shared_arrays.close(unlink=True)
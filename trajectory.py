@@ -0,0 +1,242 @@
+import os
+import json
+import queue
+import threading
+import argparse
+import numpy as np
+
+# Per-step columns: name -> (dtype, trailing shape per seeker)
+COLUMNS = {
+    "pos": (np.float64, (2,)),
+    "velocity": (np.float64, (2,)),
+    "state": (np.int8, ()),
+}
+INDEX_FILE = "index.json"
+# Default chunk size: about this many bytes, at most MAX_CHUNK_STEPS steps
+CHUNK_BYTES = 16 * 1024 * 1024
+MAX_CHUNK_STEPS = 1024
+
+def _chunk_path(directory, chunk, column):
+    """File holding one column of one chunk"""
+
+    return os.path.join(directory, f"chunk_{chunk:06d}_{column}.npy")
+
+class TrajectorySink:
+    """Capture every seeker's position, velocity and state each step.
+    Steps fill a preallocated ring of chunk buffers; a background thread
+    copies full chunks into memory-mapped .npy files and only then lists
+    them in index.json, so readers never see a half-written chunk
+    """
+
+    def __init__(self, directory, count, chunk_steps=None, buffers=3):
+        """Create directory and preallocate buffers for count seekers.
+        chunk_steps defaults to about CHUNK_BYTES of data per chunk
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.count = count
+        if chunk_steps is None:
+            step_bytes = 8 + count * sum(
+                np.dtype(dtype).itemsize * int(np.prod(shape))
+                for dtype, shape in COLUMNS.values()
+            )
+            chunk_steps = min(
+                MAX_CHUNK_STEPS,
+                max(1, CHUNK_BYTES // step_bytes),
+            )
+        self.chunk_steps = chunk_steps
+        self.free = queue.Queue()
+        for _ in range(buffers):
+            self.free.put(self._allocate())
+        self.pending = queue.Queue()
+        self.buffer = self.free.get()
+        self.row = 0
+        self.chunks = []
+        self.steps = 0
+        self.stalls = 0
+        self.error = None
+        self._write_index()
+        self.writer = threading.Thread(target=self._drain, daemon=True)
+        self.writer.start()
+
+    def _allocate(self):
+        """One chunk's worth of column arrays plus the frame numbers"""
+
+        buffer = {
+            name: np.empty((self.chunk_steps, self.count) + shape, dtype)
+            for name, (dtype, shape) in COLUMNS.items()
+        }
+        buffer["frame"] = np.empty(self.chunk_steps, dtype=np.int64)
+        return buffer
+
+    def capture(self, world):
+        """Append the world's current state as one step"""
+
+        row = self.row
+        buffer = self.buffer
+        buffer["frame"][row] = world.frame
+        if world.engine == "vectorized":
+            arrays = world.seeker_arrays
+            buffer["pos"][row] = arrays.pos
+            buffer["velocity"][row] = arrays.velocity
+            buffer["state"][row] = arrays.state
+        else:
+            pos = buffer["pos"][row]
+            velocity = buffer["velocity"][row]
+            state = buffer["state"][row]
+            for index, seeker in enumerate(world.seekers):
+                pos[index] = (seeker.x_pos, seeker.y_pos)
+                velocity[index] = seeker.velocity
+                state[index] = seeker.state.value
+        self.row += 1
+        self.steps += 1
+        if self.row == self.chunk_steps:
+            self._hand_off()
+
+    def _hand_off(self):
+        """Queue the current buffer for writing and take a free one"""
+
+        if self.error is not None:
+            raise self.error
+        self.pending.put((self.buffer, self.row))
+        try:
+            self.buffer = self.free.get_nowait()
+        except queue.Empty:
+            # The disk is behind: wait rather than grow memory
+            self.stalls += 1
+            self.buffer = self.free.get()
+        self.row = 0
+
+    def _drain(self):
+        """Writer thread: flush queued chunks until told to stop"""
+
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            buffer, rows = item
+            try:
+                self._write_chunk(buffer, rows)
+            except Exception as error:
+                # Raised again on the producer side by _hand_off or close
+                self.error = error
+            finally:
+                # Always hand the buffer back, or _hand_off waits forever
+                self.free.put(buffer)
+
+    def _write_chunk(self, buffer, rows):
+        """Copy rows of buffer into a new set of .npy files"""
+
+        chunk = len(self.chunks)
+        for name, column in buffer.items():
+            mapped = np.lib.format.open_memmap(
+                _chunk_path(self.directory, chunk, name),
+                mode="w+",
+                dtype=column.dtype,
+                shape=(rows,) + column.shape[1:],
+            )
+            mapped[:] = column[:rows]
+            mapped.flush()
+            del mapped
+        self.chunks.append(rows)
+        self._write_index()
+
+    def _write_index(self):
+        """Atomically replace index.json with the finished chunk list"""
+
+        index = {
+            "count": self.count,
+            "columns": list(COLUMNS) + ["frame"],
+            "chunks": self.chunks,
+        }
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", "w") as index_file:
+            json.dump(index, index_file)
+        os.replace(path + ".tmp", path)
+
+    def close(self):
+        """Flush the partial chunk and wait for the writer to finish"""
+
+        if self.row:
+            self.pending.put((self.buffer, self.row))
+            self.row = 0
+        self.pending.put(None)
+        self.writer.join()
+        if self.error is not None:
+            raise self.error
+
+class TrajectoryRun:
+    """Read-only, zero-copy view of a run written by TrajectorySink.
+    Safe to open while the run is still being written; refresh() picks
+    up chunks finished since
+    """
+
+    def __init__(self, directory):
+        """Open every finished chunk of the run in directory"""
+
+        self.directory = directory
+        self.chunks = []
+        self.refresh()
+
+    def refresh(self):
+        """Map chunks listed in index.json that are not open yet"""
+
+        with open(os.path.join(self.directory, INDEX_FILE)) as index_file:
+            index = json.load(index_file)
+        self.count = index["count"]
+        for chunk in range(len(self.chunks), len(index["chunks"])):
+            self.chunks.append({
+                name: np.load(
+                    _chunk_path(self.directory, chunk, name),
+                    mmap_mode="r",
+                )
+                for name in index["columns"]
+            })
+        self.starts = np.cumsum(
+            [0] + [len(chunk["frame"]) for chunk in self.chunks]
+        )
+        return self
+
+    def __len__(self):
+        """Number of steps available"""
+
+        return int(self.starts[-1])
+
+    def step(self, index):
+        """{column: array} for one step, as views into the mapped files"""
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"step {index} out of range")
+        chunk = int(np.searchsorted(self.starts, index, side="right")) - 1
+        row = index - self.starts[chunk]
+        return {
+            name: column[row] for name, column in self.chunks[chunk].items()
+        }
+
+    def column(self, name, seekers=slice(None)):
+        """Every step of one column, optionally for some seekers only.
+        This concatenates, so it copies; iterate over chunks to avoid that
+        """
+
+        return np.concatenate(
+            [chunk[name][:, seekers] if name != "frame" else chunk[name]
+             for chunk in self.chunks]
+        )
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Summarize a recorded trajectory run",
+    )
+    parser.add_argument("directory")
+    args = parser.parse_args()
+    run = TrajectoryRun(args.directory)
+    print(
+        f"{len(run)} steps x {run.count} seekers in "
+        f"{len(run.chunks)} chunks"
+    )
+    if len(run):
+        first, last = run.step(0), run.step(-1)
+        print(f"frames {first['frame']} to {last['frame']}")
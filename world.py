@@ -0,0 +1,1149 @@
+import os
+import random
+import hashlib
+from math import sqrt
+from itertools import repeat
+import numpy as np
+from profiler import active_profiler
+from steering import (
+    Mode,
+    SeekerState,
+    CENTER_POINT,
+    FLOAT32_TOLERANCE,
+    REFERENCE_RATE,
+    SeekerArrays,
+    modifiers,
+    separation_grid,
+    separation_vectors,
+    threat_displacements,
+)
+from spatial import UniformGrid
+from flowfield import FLOW_CELL_SIZE, FlowField, layout_key
+
+# Headless runs that still build Seekers import pygame; keep its banner
+# out of their output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+DEFAULT_SEEKERS = (
+    {"x_pos": 160, "y_pos": 700, "color": "faded_purple",
+     "max_speed": 12, "mass": 100, "radius": 30},
+    {"x_pos": 90, "y_pos": 700, "color": "muted_orange",
+     "max_speed": 12, "mass": 60, "radius": 20},
+    {"x_pos": 30, "y_pos": 700, "color": "yellow_cream",
+     "max_speed": 12, "mass": 20, "radius": 10},
+)
+
+# Default set_lod bands: (distance from the target, stride)
+LOD_BANDS = ((600, 2), (1200, 4), (2400, 8))
+# Steps between re-sorting seekers into LOD bands, and how far the
+# target may move before they are re-sorted sooner
+LOD_REBUCKET_STEPS = 8
+LOD_TARGET_SLACK = 100
+
+class Seeker:
+    """Class definition for seeker bots"""
+
+    __slots__ = (
+        "x_pos",
+        "y_pos",
+        "color",
+        "max_speed",
+        "mass",
+        "radius",
+        "velocity",
+        "state",
+    )
+
+    def __init__(self, x_pos, y_pos, color, max_speed, mass, radius):
+        """Initialize seeker attributes"""
+        # Only Seekers need pygame, for Vector2, so array-only scripts
+        # never import it
+        import pygame
+        self.x_pos = x_pos
+        self.y_pos = y_pos
+        self.color = color
+        self.max_speed = max_speed
+        self.mass = mass
+        self.radius = radius
+        self.velocity = pygame.Vector2()
+        self.state = SeekerState.RETURNING
+
+def default_seekers(
+    colors=None,
+    population=None,
+    bounds=(800, 800),
+):
+    """Build the default three seekers, or scatter population copies.
+    colors maps DEFAULT_SEEKERS color names to drawable colors
+    """
+
+    def color_for(template):
+        if colors is None:
+            return template["color"]
+        return colors[template["color"]]
+
+    if population is None:
+        return [
+            Seeker(**dict(template, color=color_for(template)))
+            for template in DEFAULT_SEEKERS
+        ]
+    seekers = []
+    for index in range(population):
+        template = DEFAULT_SEEKERS[index % len(DEFAULT_SEEKERS)]
+        seekers.append(
+            Seeker(x_pos=random.uniform(0, bounds[0]),
+                   y_pos=random.uniform(0, bounds[1]),
+                   color=color_for(template),
+                   max_speed=template["max_speed"],
+                   mass=template["mass"],
+                   radius=template["radius"])
+        )
+    return seekers
+
+class SteeringWorld:
+    """Headless steering state, stepped as fast as the CPU allows"""
+
+    def __init__(
+        self,
+        seekers,
+        engine="scalar",
+        mods=modifiers,
+        physics_rate=REFERENCE_RATE,
+        separation=0.0,
+        sleep=True,
+        view=(0, 0, 800, 800),
+        dtype=np.float64,
+    ):
+        """Initialize world attributes.
+        mods defaults to the shared modifiers dict driven by the sliders;
+        physics_rate is steps per simulated second;
+        separation weights a push away from overlapping neighbors;
+        sleep skips seekers that have come to rest until an input changes;
+        view is the (x, y, width, height) on screen, for
+        set_offscreen_stride;
+        dtype is the vectorized engine's storage, np.float64 or np.float32
+        """
+
+        self.seekers = seekers
+        self.engine = engine
+        if self.engine == "vectorized":
+            self.seeker_arrays = SeekerArrays.from_seekers(
+                self.seekers,
+                dtype,
+            )
+        self.modifiers = mods
+        self.mode = Mode.SEEK
+        self.target = CENTER_POINT
+        self.frame = 0
+        self.dt = REFERENCE_RATE / physics_rate
+        self.previous_pos = None
+        self._effective_key = None
+        self._effective_cache = {}
+        self.recorder = None
+        self.trajectory = None
+        self.threats = None
+        self.weighted_threats = False
+        self.threat_grid = UniformGrid(1.0)
+        self.flow_field = None
+        self.sleep = sleep
+        self.asleep = np.zeros(len(self.seekers), dtype=bool)
+        self.sleep_version = 0
+        self._active = np.arange(len(self.seekers))
+        self._activity_key = None
+        self.view = view
+        self.offscreen_stride = 1
+        self.lod_bands = None
+        self._lod_buckets = None
+        # Per seeker, the frame its last scheduled step brought it up
+        # to; None while every awake seeker steps every step
+        self._stepped = None
+        # Seekers that started and stopped fleeing in the last step,
+        # and since the world was made
+        self.transitions = (0, 0)
+        self.total_transitions = (0, 0)
+        self.separation = separation
+        self.grid = separation_grid(
+            [seeker.radius for seeker in self.seekers]
+        )
+
+    def set_target(self, target):
+        """Move the point that seekers seek or flee"""
+
+        self.target = target
+
+    def wake(self):
+        """Wake every sleeping seeker"""
+
+        if len(self._active) != len(self.seekers):
+            if self._stepped is not None:
+                # Time spent asleep is not owed to a sleeper
+                self._stepped[self.asleep] = self.frame
+            self._active = np.arange(len(self.seekers))
+            self.asleep[:] = False
+            self.sleep_version += 1
+
+    def set_threats(self, threats, weighted=False):
+        """Flee an (M, 2) array of threats instead of the target point.
+        Each seeker reacts to its nearest threat, or with weighted to
+        every threat in range; None goes back to fleeing the target
+        """
+
+        if threats is not None:
+            threats = np.asarray(threats, dtype=np.float64).reshape(-1, 2)
+        self.threats = threats
+        self.weighted_threats = weighted
+
+    def set_homes(
+        self,
+        homes,
+        obstacles=(),
+        bounds=(800, 800),
+        cell_size=FLOW_CELL_SIZE,
+    ):
+        """Send RETURNING seekers to the nearest of several home points,
+        around (x, y, radius) obstacles, through a FlowField built once
+        per layout; None goes back to returning to CENTER_POINT
+        """
+
+        if homes is None:
+            self.flow_field = None
+            return
+        if (
+            self.flow_field is None
+            or layout_key(homes, obstacles, bounds, cell_size)
+            != self.flow_field.layout
+        ):
+            self.flow_field = FlowField(homes, obstacles, bounds, cell_size)
+
+    def set_offscreen_stride(self, stride):
+        """Step seekers outside view only every stride steps, covering
+        stride steps' time at once; 1 steps everyone every step.
+        Coarser steps change the results, so recorded runs keep 1
+        """
+
+        if stride != 1 and self.recorder is not None:
+            raise ValueError("recorded worlds step every seeker each step")
+        self.offscreen_stride = stride
+        self._lod_buckets = None
+
+    def set_lod(self, bands=LOD_BANDS):
+        """Step seekers far from the target less often: bands is a
+        sequence of (distance, stride) with rising distances, and a
+        seeker at least distance away steps every stride steps,
+        covering stride steps' time at once. Fleeing seekers and any
+        within flee reach of the target or a threat always step; None
+        steps everyone every step. Recorded runs keep None
+        """
+
+        if bands is not None:
+            if self.recorder is not None:
+                raise ValueError(
+                    "recorded worlds step every seeker each step"
+                )
+            bands = tuple(
+                (float(distance), int(stride))
+                for distance, stride in bands
+            )
+            if any(stride < 1 for _, stride in bands):
+                raise ValueError("LOD strides must be at least 1")
+        self.lod_bands = bands
+        self._lod_buckets = None
+
+    def step(self, n=1):
+        """Advance the simulation n steps with the current inputs"""
+
+        if self.recorder is not None and n:
+            self.recorder.record(self, n)
+        for _ in range(n):
+            self._update_seekers(self.mode)
+            self.frame += 1
+            if self.trajectory is not None:
+                self.trajectory.capture(self)
+
+    def store_previous(self):
+        """Remember positions before a step for render interpolation"""
+
+        if self.engine == "vectorized":
+            self.previous_pos = self.seeker_arrays.pos.copy()
+        else:
+            self.previous_pos = [
+                (seeker.x_pos, seeker.y_pos) for seeker in self.seekers
+            ]
+
+    def render_positions(self, alpha=1.0, as_array=False):
+        """Positions blended between the last two physics states.
+        as_array returns an (N, 2) array instead of a list of pairs
+        """
+
+        if self.engine == "vectorized":
+            pos = self.seeker_arrays.pos
+            if self.previous_pos is not None and alpha < 1:
+                pos = self.previous_pos + (pos - self.previous_pos) * alpha
+            return pos if as_array else pos.tolist()
+        if as_array:
+            return np.array(
+                self.render_positions(alpha),
+                dtype=np.float64,
+            ).reshape(-1, 2)
+        if self.previous_pos is None or alpha >= 1:
+            return [(seeker.x_pos, seeker.y_pos) for seeker in self.seekers]
+        return [
+            (x + (seeker.x_pos - x) * alpha, y + (seeker.y_pos - y) * alpha)
+            for seeker, (x, y) in zip(self.seekers, self.previous_pos)
+        ]
+
+    def state_digest(self):
+        """SHA-256 of every seeker's position, velocity and state"""
+
+        if self.engine == "vectorized":
+            arrays = self.seeker_arrays
+            motion = np.column_stack((arrays.pos, arrays.velocity))
+            states = arrays.state
+        else:
+            motion = np.array(
+                [
+                    (seeker.x_pos, seeker.y_pos, *seeker.velocity)
+                    for seeker in self.seekers
+                ],
+                dtype=np.float64,
+            ).reshape(-1, 4)
+            states = [seeker.state.value for seeker in self.seekers]
+        digest = hashlib.sha256(
+            np.ascontiguousarray(motion, dtype=np.float64).tobytes()
+        )
+        digest.update(np.asarray(states, dtype=np.int8).tobytes())
+        return digest.digest()
+
+    def sync_seekers(self):
+        """Copy vectorized state back onto the Seeker objects"""
+
+        if self.engine == "vectorized":
+            self.seeker_arrays.write_back(self.seekers)
+
+    def _update_seekers(self, mode):
+        """Apply the speed and target forces to update position.
+        This is where the Reynolds steering philosophy is implemented
+        On every frame, each agent must:
+        1. Sense its surroundings
+        2. Use gathered sense data to generate steering desires
+        3. Blend those desires into one discrete step
+        4. Apply that step according to the defined physics of the world
+        """
+
+        self._check_modifiers_version()
+        self._check_activity(mode)
+        self.transitions = (0, 0)
+        scheduled = self._schedule()
+        if self.engine == "vectorized":
+            self._update_arrays(mode, scheduled)
+            return
+        if scheduled is None:
+            self._settle(self._step_scalar(mode, self._active, self.dt))
+            return
+        rows, dt = scheduled
+        moved = set(self._step_scalar(mode, rows, dt))
+        self._sleep_rows(
+            [index for index in rows.tolist() if index not in moved]
+        )
+
+    def _step_scalar(self, mode, rows, dt):
+        """Step the scalar engine's seekers in rows by dt, a scalar or
+        one per row. Returns the rows whose step changed anything
+        """
+
+        steps = dt.tolist() if isinstance(dt, np.ndarray) else repeat(dt)
+        pushes = None
+        if self.separation:
+            with active_profiler().section("separation"):
+                pushes = self._separation_pushes()
+        if mode == Mode.SEEK:
+            target_x, target_y = self.target
+            active = []
+            for index, dt in zip(rows.tolist(), steps):
+                seeker = self.seekers[index]
+                (
+                    effective_max_speed,
+                    effective_max_force,
+                    slowing_distance,
+                ) = self._recalculate_effective_values(seeker)
+                x_diff = target_x - seeker.x_pos
+                y_diff = target_y - seeker.y_pos
+                distance = sqrt(x_diff * x_diff + y_diff * y_diff)
+                if distance >= 1:
+                    ramped_speed = (
+                        effective_max_speed
+                        * (distance / slowing_distance)
+                    )
+                    clipped_speed = min(
+                        ramped_speed,
+                        effective_max_speed
+                    )
+                    desired_x = (x_diff / distance) * clipped_speed
+                    desired_y = (y_diff / distance) * clipped_speed
+                else:
+                    desired_x = desired_y = 0.0
+                if self._apply_steering(
+                    seeker,
+                    desired_x,
+                    desired_y,
+                    effective_max_force,
+                    effective_max_speed,
+                    dt,
+                    None if pushes is None else pushes[index],
+                ):
+                    active.append(index)
+            return active
+        else:
+            flow_field = self.flow_field
+            flee_distance = self.modifiers["flee_distance"]
+            calm_distance = (
+                flee_distance
+                * self.modifiers["calm_buffer"]
+            )
+            target_x, target_y = self.target
+            threat_vectors = self._threat_vectors()
+            entered = calmed = 0
+            active = []
+            for index, dt in zip(rows.tolist(), steps):
+                seeker = self.seekers[index]
+                state = seeker.state
+                (
+                    effective_max_speed,
+                    effective_max_force,
+                    slowing_distance,
+                ) = self._recalculate_effective_values(seeker)
+                if threat_vectors is None:
+                    threat_x = target_x - seeker.x_pos
+                    threat_y = target_y - seeker.y_pos
+                    threat_distance = sqrt(
+                        threat_x * threat_x + threat_y * threat_y
+                    )
+                else:
+                    threat_x, threat_y = threat_vectors[0][index]
+                    threat_distance = threat_vectors[1][index]
+                # Same hysteresis as flee_transitions, one seeker at a time
+                if state == SeekerState.RETURNING:
+                    if threat_distance <= flee_distance:
+                        seeker.state = SeekerState.FLEEING
+                        entered += 1
+                if seeker.state == SeekerState.FLEEING:
+                    if threat_distance >= calm_distance:
+                        seeker.state = SeekerState.RETURNING
+                        calmed += 1
+
+                if seeker.state == SeekerState.FLEEING:
+                    # Same direction as flee_velocities: away from the
+                    # threat, else along the velocity, else along +x
+                    length = sqrt(threat_x * threat_x + threat_y * threat_y)
+                    if length > 0:
+                        flee_x = -threat_x
+                        flee_y = -threat_y
+                    else:
+                        flee_x, flee_y = seeker.velocity
+                        length = sqrt(flee_x * flee_x + flee_y * flee_y)
+                        if length == 0:
+                            flee_x, flee_y, length = 1.0, 0.0, 1.0
+                    scale = effective_max_speed / length
+                    desired_x = flee_x * scale
+                    desired_y = flee_y * scale
+                elif flow_field is not None:
+                    desired_x, desired_y = flow_field.desired_velocity(
+                        seeker.x_pos,
+                        seeker.y_pos,
+                        effective_max_speed,
+                        slowing_distance,
+                    )
+                else:
+                    x_diff = CENTER_POINT[0] - seeker.x_pos
+                    y_diff = CENTER_POINT[1] - seeker.y_pos
+                    distance = sqrt(x_diff * x_diff + y_diff * y_diff)
+                    if distance >= 1:
+                        ramped_speed = (
+                            effective_max_speed
+                            * (distance / slowing_distance)
+                        )
+                        clipped_speed = min(
+                            ramped_speed,
+                            effective_max_speed,
+                        )
+                        desired_x = (x_diff / distance) * clipped_speed
+                        desired_y = (y_diff / distance) * clipped_speed
+                    else:
+                        desired_x = desired_y = 0.0
+                if self._apply_steering(
+                    seeker,
+                    desired_x,
+                    desired_y,
+                    effective_max_force,
+                    effective_max_speed,
+                    dt,
+                    None if pushes is None else pushes[index],
+                ) or seeker.state != state:
+                    active.append(index)
+            if entered or calmed:
+                self._count_transitions(entered, calmed)
+            return active
+
+    def _update_arrays(self, mode, scheduled=None):
+        """Step the vectorized engine in one batch. Without a schedule,
+        step only the awake rows if at least half are asleep, since
+        stepping a sleeper is harmless, just wasted; with one, only its
+        (rows, dt) rows, each by its own dt
+        """
+
+        if scheduled is None:
+            rows = self._active
+            if not len(rows):
+                return
+            whole = len(rows) * 2 > len(self.seekers)
+            changed = self._step_rows(mode, None if whole else rows, self.dt)
+            if changed is not None:
+                self._settle(
+                    np.flatnonzero(changed) if whole else rows[changed]
+                )
+            return
+        rows, dt = scheduled
+        if not len(rows):
+            return
+        changed = self._step_rows(mode, rows, dt)
+        if changed is not None:
+            self._sleep_rows(rows[~changed])
+
+    def _step_rows(self, mode, rows, dt):
+        """Step rows of the vectorized engine by dt, a scalar or one per
+        row, or every row when rows is None. Returns a mask of the rows
+        whose step changed anything, or None when sleep is off
+        """
+
+        arrays = self.seeker_arrays
+        if rows is not None:
+            arrays = arrays.take(rows)
+        if self.sleep:
+            # A seeker at rest before and after a step, in the same
+            # state, did not move either: pos only changes by velocity
+            velocity = arrays.velocity
+            was_still = (velocity[:, 0] == 0) & (velocity[:, 1] == 0)
+            state = arrays.state.copy()
+        arrays.update(
+            mode,
+            self.target,
+            self.modifiers,
+            dt,
+            self.separation,
+            self.grid,
+            self.threats,
+            self.weighted_threats,
+            self.threat_grid,
+            self.flow_field,
+        )
+        if rows is not None:
+            self.seeker_arrays.put(rows, arrays)
+        self._count_transitions(*arrays.transitions)
+        if not self.sleep:
+            return None
+        return (
+            ~was_still
+            | (velocity[:, 0] != 0)
+            | (velocity[:, 1] != 0)
+            | (arrays.state != state)
+        )
+
+    def _schedule(self):
+        """This step's (rows, dt) with one dt per row, or None to step
+        every awake row by dt. Rows left out wait for their turn: each
+        steps once every stride steps, staggered by index. A row's dt
+        covers every step since it last stepped, so moving between
+        bands never drops or repeats time. Separation couples
+        neighbors, so it steps everyone
+        """
+
+        if (
+            (self.offscreen_stride == 1 and self.lod_bands is None)
+            or self.separation
+        ):
+            self._lod_buckets = None
+            if self._stepped is None:
+                return None
+            # Catch every waiting row up before stepping everyone
+            rows = self._active
+            elapsed = self.frame + 1 - np.take(self._stepped, rows)
+            self._stepped = None
+            return rows, self.dt * elapsed
+        if self._stepped is None:
+            self._stepped = np.full(len(self.seekers), self.frame)
+        buckets = self._lod_buckets
+        if (
+            buckets is None
+            or self.frame - buckets["frame"] >= LOD_REBUCKET_STEPS
+            or buckets["inputs"] != self._activity_key[1:]
+            or len(self._active) > buckets["count"]
+            or np.hypot(
+                self.target[0] - buckets["target"][0],
+                self.target[1] - buckets["target"][1],
+            ) > LOD_TARGET_SLACK
+        ):
+            buckets = self._lod_buckets = self._bucket()
+        due = [self._active[:0]]
+        for stride, members, bounds in buckets["strides"]:
+            phase = -self.frame % stride
+            due.append(members[bounds[phase]:bounds[phase + 1]])
+        rows = np.concatenate(due)
+        elapsed = self.frame + 1 - np.take(self._stepped, rows)
+        self._stepped[rows] = self.frame + 1
+        return rows, self.dt * elapsed
+
+    def _bucket(self):
+        """Sort the awake rows into strides for _schedule.
+        A row's stride is its LOD band's, raised to offscreen_stride
+        off the view. Rows that are fleeing, or near enough the target
+        or a threat to start before the next rebucket, get stride 1.
+        Each stride's rows are ordered by index modulo the stride, so
+        the rows due on any step are one slice
+        """
+
+        rows = self._active
+        if self.engine == "vectorized":
+            arrays = self.seeker_arrays
+            pos = np.take(arrays.pos, rows, axis=0)
+            fleeing = (
+                np.take(arrays.state, rows) == SeekerState.FLEEING.value
+            )
+            top_speed = arrays.max_speed.max(initial=0.0)
+        else:
+            seekers = [self.seekers[index] for index in rows.tolist()]
+            pos = np.array(
+                [(seeker.x_pos, seeker.y_pos) for seeker in seekers],
+                dtype=np.float64,
+            ).reshape(-1, 2)
+            fleeing = np.array(
+                [seeker.state == SeekerState.FLEEING for seeker in seekers],
+                dtype=bool,
+            )
+            top_speed = max(
+                (seeker.max_speed for seeker in self.seekers),
+                default=0.0,
+            )
+        offset = pos - self.target
+        distance = np.hypot(offset[:, 0], offset[:, 1])
+        bands = self.lod_bands or ()
+        band_strides = np.array(
+            [1] + [stride for _, stride in bands],
+            dtype=np.intp,
+        )
+        strides = band_strides[
+            np.searchsorted(
+                [band_distance for band_distance, _ in bands],
+                distance,
+                side="right",
+            )
+        ]
+        if self.offscreen_stride > 1:
+            left, top, width, height = self.view
+            outside = ~(
+                (pos[:, 0] >= left)
+                & (pos[:, 0] <= left + width)
+                & (pos[:, 1] >= top)
+                & (pos[:, 1] <= top + height)
+            )
+            strides[outside] = np.maximum(
+                strides[outside],
+                self.offscreen_stride,
+            )
+        flee_distance = self.modifiers["flee_distance"]
+        # Flee reach, plus how far a seeker or the target can move
+        # before the next rebucket
+        reach = (
+            max(flee_distance, flee_distance * self.modifiers["calm_buffer"])
+            + top_speed * self.modifiers["max_speed"]
+            * self.dt * LOD_REBUCKET_STEPS
+            + LOD_TARGET_SLACK
+        )
+        strides[fleeing | (distance <= reach)] = 1
+        if self.threats is not None:
+            coarse = np.flatnonzero(strides > 1)
+            nearest = threat_displacements(
+                pos[coarse],
+                self.threats,
+                reach,
+                self.threat_grid,
+            )[1]
+            strides[coarse[nearest <= reach]] = 1
+        buckets = []
+        for stride in sorted(set(band_strides.tolist()) | {
+            self.offscreen_stride,
+        }):
+            members = rows[strides == stride]
+            if not len(members):
+                continue
+            phases = members % stride
+            order = np.argsort(phases, kind="stable")
+            bounds = np.searchsorted(
+                phases[order],
+                np.arange(stride + 1),
+            )
+            buckets.append((stride, members[order], bounds))
+        return {
+            "frame": self.frame,
+            "target": tuple(self.target),
+            "inputs": self._activity_key[1:],
+            "count": len(rows),
+            "strides": buckets,
+        }
+
+    def _check_activity(self, mode):
+        """Wake every seeker if anything that drives them changed.
+        Separation couples neighbors, so nothing sleeps while it is on
+        """
+
+        version = getattr(self.modifiers, "version", None)
+        key = (
+            tuple(self.target),
+            mode,
+            id(self.modifiers),
+            version,
+            id(self.threats),
+            self.weighted_threats,
+            id(self.flow_field),
+            self.dt,
+        )
+        if (
+            not self.sleep
+            or self.separation
+            or version is None
+            or key != self._activity_key
+        ):
+            self.wake()
+        self._activity_key = key
+
+    def _sleep_rows(self, rows):
+        """Put rows to sleep, the ones whose last step changed nothing"""
+
+        if not self.sleep or self.separation:
+            return
+        rows = np.asarray(rows, dtype=np.intp)
+        if self.asleep[rows].all():
+            return
+        self.asleep[rows] = True
+        self._active = np.flatnonzero(~self.asleep)
+        self.sleep_version += 1
+
+    def _settle(self, active):
+        """Put to sleep every seeker missing from active, the ones whose
+        last step changed nothing: with the same inputs, every later
+        step would leave them exactly where they are
+        """
+
+        if not self.sleep or self.separation:
+            return
+        if len(active) != len(self._active):
+            self._active = np.asarray(active, dtype=np.intp)
+            self.asleep[:] = True
+            self.asleep[self._active] = False
+            self.sleep_version += 1
+
+    def _count_transitions(self, entered, calmed):
+        """Add counts of flee transitions to the statistics"""
+
+        self.transitions = (
+            self.transitions[0] + entered,
+            self.transitions[1] + calmed,
+        )
+        self.total_transitions = (
+            self.total_transitions[0] + entered,
+            self.total_transitions[1] + calmed,
+        )
+
+    def _threat_vectors(self):
+        """Lists of per-seeker threat displacements and nearest-threat
+        distances, or None when fleeing the single target point
+        """
+
+        if self.threats is None:
+            return None
+        flee_distance = self.modifiers["flee_distance"]
+        displacement, distance = threat_displacements(
+            [(seeker.x_pos, seeker.y_pos) for seeker in self.seekers],
+            self.threats,
+            max(flee_distance, flee_distance * self.modifiers["calm_buffer"]),
+            self.threat_grid,
+            self.weighted_threats,
+        )
+        return displacement.tolist(), distance.tolist()
+
+    def _separation_pushes(self):
+        """Each seeker's push away from overlapping neighbors, as a list
+        of (x, y) in seeker order
+        """
+
+        return separation_vectors(
+            [(seeker.x_pos, seeker.y_pos) for seeker in self.seekers],
+            [seeker.radius for seeker in self.seekers],
+            self.grid,
+        ).tolist()
+
+    def _check_modifiers_version(self):
+        """Empty the effective value cache if the modifiers changed"""
+
+        version = getattr(self.modifiers, "version", None)
+        key = (id(self.modifiers), version)
+        if version is None or key != self._effective_key:
+            self._effective_cache.clear()
+            self._effective_key = key if version is not None else None
+
+    def _recalculate_effective_values(self, seeker):
+        """Look up values that need current modifiers.
+        Seekers sharing max_speed and mass share one cached entry
+        """
+
+        cache_key = (seeker.max_speed, seeker.mass)
+        values = self._effective_cache.get(cache_key)
+        if values is None:
+            values = self._compute_effective_values(seeker)
+            if self._effective_key is not None:
+                self._effective_cache[cache_key] = values
+        return values
+
+    def _compute_effective_values(self, seeker):
+        """Recalculate values that need current modifiers"""
+
+        effective_max_speed = seeker.max_speed * self.modifiers["max_speed"]
+        effective_mass = seeker.mass * self.modifiers["mass"]
+        response_time = effective_mass / self.modifiers["responsiveness"]
+        effective_max_force = (
+            (effective_max_speed / response_time) 
+            * self.modifiers["max_force"]
+        )
+        slowing_distance = (
+            (effective_max_speed ** 2) 
+            / (effective_max_force * 2)
+        )
+        return (effective_max_speed, effective_max_force, slowing_distance)
+
+    def _apply_steering(
+            self,
+            seeker,
+            desired_x,
+            desired_y,
+            effective_max_force,
+            effective_max_speed,
+            dt,
+            push=None,
+        ):
+        """Use a desired velocity and physics constraints to increment position.
+        Works on plain floats, matching Vector2's arithmetic bit for bit
+        without allocating vectors. push is the seeker's separation push,
+        if any. Returns whether the seeker changed
+        """
+
+        velocity = seeker.velocity
+        if push is not None:
+            weight = self.separation * effective_max_speed
+            desired_x += push[0] * weight
+            desired_y += push[1] * weight
+        max_step_force = effective_max_force * dt
+        force_x = desired_x - velocity.x
+        force_y = desired_y - velocity.y
+        force = sqrt(force_x * force_x + force_y * force_y)
+        if force > max_step_force:
+            scale = max_step_force / force
+            force_x *= scale
+            force_y *= scale
+        velocity_x = velocity.x + force_x
+        velocity_y = velocity.y + force_y
+        speed = sqrt(velocity_x * velocity_x + velocity_y * velocity_y)
+        if speed > effective_max_speed:
+            scale = effective_max_speed / speed
+            velocity_x *= scale
+            velocity_y *= scale
+        changed = velocity_x != velocity.x or velocity_y != velocity.y
+        velocity.update(velocity_x, velocity_y)
+        x_pos = seeker.x_pos + velocity_x * dt
+        y_pos = seeker.y_pos + velocity_y * dt
+        changed = changed or x_pos != seeker.x_pos or y_pos != seeker.y_pos
+        seeker.x_pos = x_pos
+        seeker.y_pos = y_pos
+        return changed
+
+class FixedTimestep:
+    """Accumulate real frame time and step a world at a fixed rate.
+    Rendering reads alpha to interpolate between the last two states
+    """
+
+    def __init__(self, world, max_substeps=8, interpolate=True):
+        """Initialize timestep attributes"""
+
+        self.world = world
+        self.step_seconds = world.dt / REFERENCE_RATE
+        self.max_substeps = max_substeps
+        self.interpolate = interpolate
+        self.accumulator = 0.0
+        self.dropped_steps = 0
+
+    def advance(self, elapsed):
+        """Run every whole physics step that fits in elapsed seconds"""
+
+        self.accumulator += elapsed
+        steps = min(
+            int(self.accumulator // self.step_seconds),
+            self.max_substeps,
+        )
+        if steps:
+            if self.interpolate:
+                self.world.step(steps - 1)
+                self.world.store_previous()
+                self.world.step()
+            else:
+                self.world.step(steps)
+        self.accumulator -= steps * self.step_seconds
+        if steps == self.max_substeps:
+            # Drop backlog we can't catch up on rather than spiral
+            kept = min(self.accumulator, self.step_seconds)
+            self.dropped_steps += int(
+                (self.accumulator - kept) // self.step_seconds
+            )
+            self.accumulator = kept
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of a physics step left over for interpolation"""
+
+        if not self.interpolate:
+            return 1.0
+        return self.accumulator / self.step_seconds
+
+def check_float32(population=2000, seed=0, max_steps=3000):
+    """Run seek arrival and flee hysteresis in float64 and float32
+    worlds, then hold the target until both settle. Returns (scenario,
+    states match, largest rest gap in pixels, passed) rows; passing needs
+    both worlds asleep with equal seeker states and a gap within
+    FLOAT32_TOLERANCE
+    """
+
+    def run(dtype, mode, targets):
+        random.seed(seed)
+        world = SteeringWorld(
+            default_seekers(population=population),
+            engine="vectorized",
+            dtype=dtype,
+        )
+        world.mode = mode
+        for target in targets:
+            world.set_target(target)
+            world.step()
+        for _ in range(max_steps):
+            if world.asleep.all():
+                break
+            world.step()
+        return world
+
+    # The flee sweep crosses the crowd twice so seekers keep passing both
+    # the flee and the calm distance. It stays off the row through
+    # CENTER_POINT: a seeker rounded onto the line through its home and
+    # a parked target bounces between the two forever in either dtype
+    sweep = np.linspace(100, 700, 300)
+    scenarios = (
+        ("seek arrival", Mode.SEEK, [(600, 250)] * 300),
+        (
+            "flee hysteresis",
+            Mode.FLEE,
+            [(x, 330) for x in np.concatenate((sweep, sweep[::-1]))]
+            + [(150, 650)],
+        ),
+    )
+    rows = []
+    for name, mode, targets in scenarios:
+        wide = run(np.float64, mode, targets)
+        narrow = run(np.float32, mode, targets)
+        states_match = (
+            wide.asleep.all()
+            and narrow.asleep.all()
+            and np.array_equal(
+                wide.seeker_arrays.state,
+                narrow.seeker_arrays.state,
+            )
+        )
+        gap = float(np.abs(
+            wide.seeker_arrays.pos - narrow.seeker_arrays.pos
+        ).max())
+        rows.append((
+            name,
+            states_match,
+            gap,
+            states_match and gap <= FLOAT32_TOLERANCE,
+        ))
+    return rows
+
+if __name__ == '__main__':
+    import time
+    import argparse
+    parser = argparse.ArgumentParser(description="Headless seek and flee")
+    parser.add_argument(
+        "--engine",
+        choices=("scalar", "vectorized", "tiled"),
+        default="vectorized",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes for the tiled engine (default: one per CPU)",
+    )
+    parser.add_argument("--population", type=int, default=None)
+    parser.add_argument(
+        "--world-size",
+        type=float,
+        nargs=2,
+        default=(800, 800),
+        metavar=("W", "H"),
+        help="scatter the population over this area",
+    )
+    parser.add_argument("--frames", type=int, default=10000)
+    parser.add_argument(
+        "--physics-rate",
+        type=float,
+        default=REFERENCE_RATE,
+    )
+    parser.add_argument("--mode", choices=("seek", "flee"), default="seek")
+    parser.add_argument("--separation", type=float, default=0.0)
+    parser.add_argument(
+        "--target",
+        type=float,
+        nargs=2,
+        default=CENTER_POINT,
+    )
+    parser.add_argument(
+        "--threats",
+        type=int,
+        default=0,
+        help="in flee mode, flee this many random threat points",
+    )
+    parser.add_argument(
+        "--weighted-threats",
+        action="store_true",
+        help="react to every threat in range, not just the nearest",
+    )
+    parser.add_argument(
+        "--homes",
+        type=float,
+        nargs="+",
+        default=None,
+        metavar="X Y",
+        help="in flee mode, return to the nearest of these points",
+    )
+    parser.add_argument(
+        "--obstacles",
+        type=float,
+        nargs="+",
+        default=(),
+        metavar="X Y R",
+        help="circles that returning seekers route around",
+    )
+    parser.add_argument(
+        "--no-sleep",
+        action="store_true",
+        help="keep stepping seekers that have come to rest",
+    )
+    parser.add_argument(
+        "--lod",
+        action="store_true",
+        help="step seekers far from the target less often",
+    )
+    parser.add_argument(
+        "--trajectory",
+        default=None,
+        metavar="DIR",
+        help="stream every step's positions, velocities and states to DIR",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="store the vectorized engine's arrays as float32",
+    )
+    parser.add_argument(
+        "--check-float32",
+        action="store_true",
+        help="check float32 against float64 on seek arrival and flee "
+        "hysteresis, then exit",
+    )
+    args = parser.parse_args()
+    if args.check_float32:
+        failed = False
+        for name, states_match, gap, passed in check_float32(
+            population=args.population or 2000,
+        ):
+            print(
+                f"{name}: states {'match' if states_match else 'DIFFER'}, "
+                f"largest gap {gap:.2e}px "
+                f"(tolerance {FLOAT32_TOLERANCE}px) "
+                f"{'ok' if passed else 'FAILED'}"
+            )
+            failed = failed or not passed
+        raise SystemExit(1 if failed else 0)
+    if args.homes and len(args.homes) % 2:
+        parser.error("--homes takes X Y pairs")
+    if len(args.obstacles) % 3:
+        parser.error("--obstacles takes X Y R triples")
+    if args.float32 and args.engine != "vectorized":
+        parser.error("--float32 needs the vectorized engine")
+    if args.engine == "tiled":
+        if args.homes or args.trajectory or args.lod:
+            parser.error(
+                "--homes, --trajectory and --lod need a single process"
+            )
+        from tiled import TiledWorld
+        world = TiledWorld(
+            default_seekers(
+                population=args.population,
+                bounds=args.world_size,
+            ),
+            workers=args.workers,
+            physics_rate=args.physics_rate,
+            separation=args.separation,
+        )
+    else:
+        world = SteeringWorld(
+            default_seekers(
+                population=args.population,
+                bounds=args.world_size,
+            ),
+            engine=args.engine,
+            physics_rate=args.physics_rate,
+            separation=args.separation,
+            sleep=not args.no_sleep,
+            dtype=np.float32 if args.float32 else np.float64,
+        )
+    world.mode = Mode[args.mode.upper()]
+    world.set_target(tuple(args.target))
+    if args.threats:
+        world.set_threats(
+            [
+                (random.uniform(0, 800), random.uniform(0, 800))
+                for _ in range(args.threats)
+            ],
+            args.weighted_threats,
+        )
+    if args.homes:
+        world.set_homes(
+            np.reshape(args.homes, (-1, 2)),
+            np.reshape(args.obstacles, (-1, 3)),
+        )
+    if args.lod:
+        world.set_lod()
+    if args.trajectory:
+        from trajectory import TrajectorySink
+        world.trajectory = TrajectorySink(args.trajectory, len(world.seekers))
+    start = time.perf_counter()
+    world.step(args.frames)
+    if world.trajectory is not None:
+        world.trajectory.close()
+    elapsed = time.perf_counter() - start
+    if args.engine == "tiled":
+        world.close()
+    print(
+        f"{args.frames} frames x {len(world.seekers)} seekers "
+        f"in {elapsed:.3f}s ({args.frames / elapsed:.0f} frames/s)"
+    )
+    if args.mode == "flee" and args.engine != "tiled":
+        entered, calmed = world.total_transitions
+        print(f"{entered} started fleeing, {calmed} calmed down")